@@ -0,0 +1,126 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import scheduler
+from generate_workload import generate_workload, write_workload
+
+# Benchmark runner for the scheduler package. Generates seeded workloads of
+# increasing size, runs each algorithm on them in a fresh interpreter (so
+# peak RSS belongs to that one run), and saves the timings as JSON that
+# can be compared against an earlier revision with --compare.
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+
+# Run one case in this process and print its measurements as JSON.
+# Called in a child interpreter by run_case.
+def measure_case(input_file, algorithm, quantum):
+    started = time.perf_counter()
+    workload = scheduler.load_workload(input_file)
+    processes, run_for = workload.processes, workload.run_for
+    parsed = time.perf_counter()
+
+    # Simulate, counting events but not formatting them
+    _, events = scheduler.scheduler_events(processes, run_for, algorithm, quantum=quantum)
+    event_count = 0
+    for _ in events:
+        event_count += 1
+    simulated = time.perf_counter()
+
+    # Render and write a full .out for the same workload
+    processes = scheduler.ProcessTable.from_columns(processes.names, processes.arrival, processes.burst, processes.tickets,
+                                                    processes.io_offset, processes.io_phases)
+    scheduler.write_output_file(os.devnull, scheduler.run_scheduler(processes, run_for, algorithm, quantum=quantum))
+    written = time.perf_counter()
+
+    print(json.dumps({
+        "events": event_count,
+        "parse_s": parsed - started,
+        "simulate_s": simulated - parsed,
+        "render_s": written - simulated,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }))
+
+# Run one case in a child interpreter and return its result row
+def run_case(input_file, size, algorithm, quantum):
+    command = [sys.executable, os.path.abspath(__file__), "--case", input_file, algorithm, str(quantum)]
+    started = time.perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - started
+
+    row = {"size": size, "algorithm": algorithm, "quantum": quantum if scheduler.get_algorithm(algorithm).accepts("quantum") else None}
+    row.update(json.loads(result.stdout))
+    row["wall_s"] = wall
+    row["events_per_sec"] = row["events"] / row["simulate_s"] if row["simulate_s"] > 0 else 0.0
+    return row
+
+# Current git revision, if this is a git checkout
+def git_revision():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+# Run every (size, algorithm) case and return the full report
+def run_benchmarks(sizes, algorithms, quantum, seed, arrivals):
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            input_file = os.path.join(workdir, f"bench-{size}.in")
+            write_workload(input_file, generate_workload(size, seed=seed, arrivals=arrivals))
+            for algorithm in algorithms:
+                row = run_case(input_file, size, algorithm, quantum)
+                print(f"{size:>8} {algorithm:<5} {row['wall_s']:>9.3f}s {row['events_per_sec']:>12.0f} events/s "
+                      f"{row['peak_rss_kb']:>9} KB", file=sys.stderr)
+                results.append(row)
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": seed,
+        "arrivals": arrivals,
+        "results": results,
+    }
+
+# Print wall-time and memory ratios against an earlier report
+def compare_reports(baseline, report):
+    previous = {(row["size"], row["algorithm"], row["quantum"]): row for row in baseline["results"]}
+    print(f"Compared with revision {baseline.get('revision')}:")
+    for row in report["results"]:
+        old = previous.get((row["size"], row["algorithm"], row["quantum"]))
+        if old is None or old["wall_s"] == 0:
+            continue
+        print(f"{row['size']:>8} {row['algorithm']:<5} wall x{row['wall_s'] / old['wall_s']:.2f} "
+              f"rss x{row['peak_rss_kb'] / max(old['peak_rss_kb'], 1):.2f}")
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "--case":
+        measure_case(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description="Benchmark the scheduler on generated workloads.")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES))
+    parser.add_argument("--algorithms", default="fcfs,sjf,rr")
+    parser.add_argument("--quantum", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--arrivals", choices=["poisson", "onoff"], default="poisson")
+    parser.add_argument("-o", "--output", default="benchmark-results.json")
+    parser.add_argument("--compare", help="earlier JSON report to compare against")
+    options = parser.parse_args()
+
+    report = run_benchmarks([int(size) for size in options.sizes.split(",")], options.algorithms.split(","),
+                            options.quantum, options.seed, options.arrivals)
+    with open(options.output, 'w') as file:
+        json.dump(report, file, indent=2)
+
+    if options.compare:
+        with open(options.compare) as file:
+            compare_reports(json.load(file), report)
@@ -0,0 +1,119 @@
+import argparse
+import math
+import random
+import sys
+
+# Synthetic workload generator for scheduler-gpt.py. Writes the same .in
+# format as the files in inputs/, with arrivals drawn from a Poisson
+# process or a bursty on/off source and heavy-tailed (Pareto) bursts.
+# The same seed always produces the same file.
+
+# Arrival times from a Poisson process: exponential gaps at the given rate
+def poisson_arrivals(rng, count, rate):
+    time = 0.0
+    for _ in range(count):
+        time += rng.expovariate(rate)
+        yield int(time)
+
+# Arrival times from an on/off source: Poisson arrivals at the given rate
+# during "on" periods, nothing during "off" periods. Both period lengths
+# are exponential with the given means.
+def on_off_arrivals(rng, count, rate, mean_on, mean_off):
+    time = 0.0
+    on_until = rng.expovariate(1 / mean_on)
+    generated = 0
+    while generated < count:
+        time += rng.expovariate(rate)
+        if time > on_until:
+            # Skip the off period and start a new on period after it
+            time = on_until + rng.expovariate(1 / mean_off)
+            on_until = time + rng.expovariate(1 / mean_on)
+            continue
+        generated += 1
+        yield int(time)
+
+# Heavy-tailed burst: Pareto with the given shape, scaled so the smallest
+# burst is min_burst, and clipped at max_burst
+def pareto_burst(rng, alpha, min_burst, max_burst):
+    return min(max_burst, max(1, int(min_burst * rng.paretovariate(alpha))))
+
+# Build the lines of a .in file for one generated workload
+def generate_workload(count, seed=0, algorithm="fcfs", quantum=2, arrivals="poisson",
+                      rate=0.1, mean_on=50.0, mean_off=200.0, alpha=1.5,
+                      min_burst=1, max_burst=1000, run_for=None, cpus=1, io_bursts=0, mean_io=10.0):
+    rng = random.Random(seed)
+    if arrivals == "poisson":
+        arrival_times = list(poisson_arrivals(rng, count, rate))
+    elif arrivals == "onoff":
+        arrival_times = list(on_off_arrivals(rng, count, rate, mean_on, mean_off))
+    else:
+        raise ValueError(f"Unsupported arrival pattern {arrivals}.")
+    bursts = [pareto_burst(rng, alpha, min_burst, max_burst) for _ in range(count)]
+
+    # Optionally split each process into io_bursts + 1 CPU bursts with
+    # exponential I/O waits in between
+    phases = []
+    for burst in bursts:
+        extra = ""
+        for _ in range(io_bursts):
+            extra += f" io {max(1, int(rng.expovariate(1 / mean_io)))} burst {pareto_burst(rng, alpha, min_burst, max_burst)}"
+        phases.append(extra)
+
+    # By default run long enough for every process to finish
+    if run_for is None:
+        run_for = max(arrival_times, default=0) + sum(bursts) + 1
+        run_for += sum(int(part) for extra in phases for part in extra.split()[1::2])
+
+    width = max(2, len(str(count)))
+    lines = [
+        f"processcount {count}\t# Read {count} processes",
+        f"runfor {run_for}\t# Run for {run_for} time units",
+        f"use {algorithm}",
+    ]
+    if cpus > 1:
+        lines.append(f"cpus {cpus}")
+    if algorithm == "rr":
+        lines.append(f"quantum {quantum}")
+    for number, (arrival, burst, extra) in enumerate(zip(arrival_times, bursts, phases), start=1):
+        lines.append(f"process name P{number:0{width}d} arrival {arrival} burst {burst}{extra}")
+    lines.append("end")
+    return lines
+
+# Write a generated workload to a .in file
+def write_workload(output_file, lines):
+    with open(output_file, 'w', buffering=1 << 20) as file:
+        file.writelines(line + "\n" for line in lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a seeded scheduler workload (.in file).")
+    parser.add_argument("output_file")
+    parser.add_argument("-n", "--processes", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--use", dest="algorithm", default="fcfs")
+    parser.add_argument("--quantum", type=int, default=2)
+    parser.add_argument("--arrivals", choices=["poisson", "onoff"], default="poisson")
+    parser.add_argument("--rate", type=float, default=0.1, help="arrivals per time unit (while on)")
+    parser.add_argument("--mean-on", type=float, default=50.0)
+    parser.add_argument("--mean-off", type=float, default=200.0)
+    parser.add_argument("--alpha", type=float, default=1.5, help="Pareto shape for bursts")
+    parser.add_argument("--min-burst", type=int, default=1)
+    parser.add_argument("--max-burst", type=int, default=1000)
+    parser.add_argument("--runfor", type=int, default=None)
+    parser.add_argument("--cpus", type=int, default=1)
+    parser.add_argument("--io-bursts", type=int, default=0, help="I/O bursts per process")
+    parser.add_argument("--mean-io", type=float, default=10.0, help="mean I/O burst length")
+    options = parser.parse_args()
+
+    if not options.output_file.endswith(".in"):
+        print("Error: Output file must have a .in extension.")
+        sys.exit(1)
+    if options.rate <= 0 or not math.isfinite(options.rate):
+        print("Error: Arrival rate must be a positive number.")
+        sys.exit(1)
+
+    write_workload(options.output_file, generate_workload(
+        options.processes, seed=options.seed, algorithm=options.algorithm, quantum=options.quantum,
+        arrivals=options.arrivals, rate=options.rate, mean_on=options.mean_on, mean_off=options.mean_off,
+        alpha=options.alpha, min_burst=options.min_burst, max_burst=options.max_burst, run_for=options.runfor,
+        cpus=options.cpus, io_bursts=options.io_bursts, mean_io=options.mean_io,
+    ))
@@ -1,22 +1,304 @@
+import difflib
+import glob
+import hashlib
+import io
+import json
+import math
 import os
+import random
 import subprocess
+import sys
+import tempfile
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+from scheduler import ALGORITHMS, load_workload
+from scheduler.cli import main as scheduler_main
+from scheduler.parse import parse_workload_lines
+from scheduler.stats import QUANTILES, RELATIVE_ACCURACY, QuantileSketch, run_statistics
+from scheduler.timeline import Timeline
+
+# Golden-file test runner. The scheduler is imported once and every case
+# runs in-process on a worker pool, through the same command line entry
+# point as scheduler-gpt.py (with --no-cache, so every case really runs);
+# outputs are compared with difflib, so no subprocess or PowerShell is
+# needed. A case whose expected output is missing, or whose run fails,
+# fails on its own without stopping the others. Passing cases are
+# remembered in a cache keyed on the input, expected output and scheduler
+# source, and are skipped on the next run until one of those changes.
+#
+# Cases for the algorithms in SWEEP_ALGORITHMS, which read parameters besides
+# the quantum, are also swept at their own settings with --sweep, and the
+# sweep's metrics must match the ones --summary prints for the normal run.
+#
+# Once a case's output matches, the functions in CASE_CHECKS run on it too.
+# Each covers a feature that should reproduce the same run another way
+# (a trace, a resumed checkpoint, the online service, ...) and returns a
+# message saying what differed, or None if the case passes or doesn't apply.
+#
+# The functions in PACKAGE_CHECKS test parts of the package no case output
+# shows (the statistics sketches, ...). They run once, in the main process,
+# are reported like cases and are cached on the scheduler source alone.
+
+CACHE_FILE = ".test_cache.json"
+SWEEP_ALGORITHMS = ("lottery", "mlfq")
+CHECKPOINT_CUTS = (3, 8, 13)  # Shorter runfors a resumable case is checkpointed at
+
+# Hash of the scheduler's source: the entry script, the whole package and
+# the checks in this file
+def scheduler_source_hash():
+    digest = hashlib.sha256()
+    for path in ["scheduler-gpt.py", "run_tests.py"] + sorted(glob.glob(os.path.join("scheduler", "*.py"))):
+        with open(path, 'rb') as file:
+            digest.update(path.encode() + b"\0" + file.read())
+    return digest.hexdigest()
+
+# Hash of everything a case's result depends on
+def case_key(input_file, expected_output_file, scheduler_hash):
+    digest = hashlib.sha256(scheduler_hash.encode())
+    for path in (input_file, expected_output_file):
+        try:
+            with open(path, 'rb') as file:
+                digest.update(hashlib.sha256(file.read()).digest())
+        except OSError:
+            digest.update(b"missing")  # Fails when run, and is never cached as passing
+    return digest.hexdigest()
+
+# Run the scheduler's command line in this process: (exit status, printed output)
+def run_cli(args):
+    output = io.StringIO()
+    status = 0
+    try:
+        with redirect_stdout(output):
+            scheduler_main(args)
+    except SystemExit as exit:
+        status = exit.code if isinstance(exit.code, int) else 1
+    return status, output.getvalue()
 
 def run_test(input_file, expected_output_file, actual_output_file):
-    # Run the scheduling script to generate the actual output (scheduler-gpt.py writes to the actual folder internally)
-    subprocess.run(['python', 'scheduler-gpt.py', input_file])
+    try:
+        with open(expected_output_file) as file:
+            expected = file.read().splitlines()
+    except OSError as error:
+        return False, f"missing expected output: {error}\n"
+
+    # Run the scheduler as scheduler-gpt.py would; it writes the actual
+    # output, which is kept for inspection
+    if os.path.exists(actual_output_file):
+        os.remove(actual_output_file)  # Don't compare a stale one if the run fails
+    try:
+        status, printed = run_cli([input_file, "--no-cache"])
+        if status != 0:
+            return False, f"scheduler exited with status {status}: {printed}"
+        with open(actual_output_file) as file:
+            actual = file.read().splitlines()
+    except Exception:
+        return False, f"scheduler error:\n{traceback.format_exc()}"
+
+    # Compare the actual and expected output line by line
+    if actual != expected:
+        diff = difflib.unified_diff(expected, actual, expected_output_file, actual_output_file, lineterm="")
+        return False, "\n".join(diff) + "\n"
+
+    for check in CASE_CHECKS:
+        try:
+            message = check(input_file, expected)
+        except Exception:
+            message = f"error:\n{traceback.format_exc()}"
+        if message is not None:
+            return False, f"{check.__name__}: {message}\n"
+    return True, ""
+
+# Time-indexed queries on the case's trace: running_at on a fresh Timeline
+# (before anything else has built its index) agrees with state_at
+def check_timeline(input_file, expected):
+    workload = load_workload(input_file)
+    trace_file = os.path.join("actual", os.path.basename(input_file).replace(".in", ".trace"))
+    status, printed = run_cli([input_file, "--trace"])
+    if status != 0:
+        return f"--trace exited with status {status}: {printed}"
+    try:
+        with Timeline.from_trace(trace_file) as timeline:
+            cpus = timeline.state_at(0)["running"]
+            for t in range(workload.run_for + 1):
+                running = timeline.state_at(t)["running"]
+                for cpu in range(len(cpus)):
+                    with Timeline.from_trace(trace_file) as fresh:
+                        name = fresh.running_at(t, cpu)
+                    if name != running[cpu]:
+                        return f"running_at({t}, {cpu}) is {name}, state_at says {running[cpu]}"
+    finally:
+        os.remove(trace_file)
+    return None
+
+# Checkpoint and resume: run the case's workload to each cut in
+# CHECKPOINT_CUTS with --checkpoint, then --resume it to the full runfor;
+# the resumed output must be the expected one. The copies of the input get
+# names of their own, so their outputs don't overwrite the case's.
+def check_checkpoint(input_file, expected):
+    workload = load_workload(input_file)
+    if not ALGORITHMS[workload.algorithm].resumable or workload.cpus != 1:
+        return None
+    with open(input_file) as file:
+        lines = file.read().splitlines()
+    stem = os.path.basename(input_file).replace(".in", "")
+    with tempfile.TemporaryDirectory() as directory:
+        for cut in CHECKPOINT_CUTS:
+            if cut >= workload.run_for:
+                continue
+            checkpoint_file = os.path.join(directory, f"{stem}-{cut}.ckpt")
+            runs = [(f"{stem}-cut{cut}", cut, "--checkpoint"), (f"{stem}-resumed{cut}", workload.run_for, "--resume")]
+            try:
+                for name, run_for, flag in runs:
+                    cut_file = os.path.join(directory, f"{name}.in")
+                    with open(cut_file, 'w') as file:
+                        for line in lines:
+                            file.write(f"runfor {run_for}\n" if line.split()[:1] == ["runfor"] else f"{line}\n")
+                    status, printed = run_cli([cut_file, flag, checkpoint_file])
+                    if status != 0:
+                        return f"{flag} at runfor {run_for} exited with status {status}: {printed}"
+                with open(os.path.join("actual", f"{runs[1][0]}.out")) as file:
+                    actual = file.read().splitlines()
+            finally:
+                for name, _, _ in runs:
+                    if os.path.exists(os.path.join("actual", f"{name}.out")):
+                        os.remove(os.path.join("actual", f"{name}.out"))
+            if actual != expected:
+                diff = difflib.unified_diff(expected, actual, "expected", f"resumed from runfor {cut}", lineterm="")
+                return "\n".join(diff)
+    return None
+
+# The online service: pipe the case's process lines, sorted by arrival,
+# through python -m scheduler.online; it must log what the offline run
+# did, less the process count line it can't know up front
+def check_online(input_file, expected):
+    workload = load_workload(input_file)
+    if not ALGORITHMS[workload.algorithm].online or workload.cpus != 1:
+        return None
+    with open(input_file) as file:
+        lines = [line for line in file if line.split()[:1] == ["process"]]
+    lines.sort(key=lambda line: int(line.split()[4]))
+    command = [sys.executable, "-m", "scheduler.online", workload.algorithm, "--runfor", str(workload.run_for)]
+    if "quantum" in workload.params:
+        command += ["--quantum", str(workload.params["quantum"])]
+    result = subprocess.run(command, input="".join(lines), capture_output=True, text=True)
+    if result.returncode != 0 or result.stderr:
+        return f"scheduler.online exited with status {result.returncode}: {result.stdout}{result.stderr}"
+    actual = result.stdout.splitlines()
+    if actual != expected[1:]:
+        diff = difflib.unified_diff(expected[1:], actual, "expected", "scheduler.online", lineterm="")
+        return "\n".join(diff)
+    return None
+
+# Packed workloads: pack the case with python -m scheduler.packed, unpack
+# the result again, and run both; each must log the expected output
+def check_packed(input_file, expected):
+    stem = os.path.basename(input_file).replace(".in", "")
+    with tempfile.TemporaryDirectory() as directory:
+        packed_file = os.path.join(directory, f"{stem}-packed.wl")
+        unpacked_file = os.path.join(directory, f"{stem}-unpacked.in")
+        for source, target in ((input_file, packed_file), (packed_file, unpacked_file)):
+            result = subprocess.run([sys.executable, "-m", "scheduler.packed", source, target],
+                                    capture_output=True, text=True)
+            if result.returncode != 0:
+                return f"scheduler.packed {source} exited with status {result.returncode}: {result.stdout}"
+        for workload_file in (packed_file, unpacked_file):
+            output_file = os.path.join("actual", os.path.basename(workload_file).rsplit(".", 1)[0] + ".out")
+            try:
+                status, printed = run_cli([workload_file, "--no-cache"])
+                if status != 0:
+                    return f"{os.path.basename(workload_file)} exited with status {status}: {printed}"
+                with open(output_file) as file:
+                    actual = file.read().splitlines()
+            finally:
+                if os.path.exists(output_file):
+                    os.remove(output_file)
+            if actual != expected:
+                diff = difflib.unified_diff(expected, actual, "expected", os.path.basename(workload_file), lineterm="")
+                return "\n".join(diff)
+    return None
+
+CASE_CHECKS = [check_timeline, check_checkpoint, check_online, check_packed]
 
-    # Use PowerShell's Compare-Object to compare the actual and expected output
-    command = f"Compare-Object (Get-Content {actual_output_file}) (Get-Content {expected_output_file})"
-    result = subprocess.run(["powershell", "-Command", command], capture_output=True, text=True)
+# Sweep a case's workload over its own algorithm and quantum. Runs in the
+# main process, since the sweep starts a process pool of its own.
+def run_sweep_test(input_file):
+    try:
+        algorithm = load_workload(input_file).algorithm
+        if algorithm not in SWEEP_ALGORITHMS:
+            return True, ""
+        status, summary = run_cli([input_file, "--summary", "--no-cache"])
+        if status != 0:
+            return False, f"summary exited with status {status}: {summary}"
+        status, sweep = run_cli([input_file, "--sweep", algorithm])
+        if status != 0:
+            return False, f"sweep exited with status {status}: {sweep}"
+    except Exception:
+        return False, f"sweep error:\n{traceback.format_exc()}"
+    expected = dict(line.split(" ", 1) for line in summary.splitlines())
+    rows = [line.split("\t") for line in sweep.splitlines()]
+    actual = {key: value for key, value in zip(*rows[:2]) if key not in ("algorithm", "quantum")}
+    if len(rows) == 2 and actual == expected:
+        return True, ""
+    return False, f"sweep metrics {actual}\n   run metrics {expected}\n"
 
-    # If there is any output from Compare-Object, the files are different
-    if result.stdout.strip():
-        print(f"{input_file}: Fail")
-        print(result.stdout)  # Print the differences
-    else:
-        print(f"{input_file}: Pass")
+# Statistics: the sketch's quantiles of a seeded sample are within its
+# relative accuracy of the exact (nearest rank) ones, two shards merge into
+# the sketch of the whole, and the processes a short runfor cuts off are
+# split into starved and unfinished
+def check_statistics():
+    draw = random.Random(0)
+    values = [int(draw.lognormvariate(6, 2)) for _ in range(20000)]
+    whole, first, second = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for value in values:
+        whole.add(value)
+    for value in values[::2]:
+        first.add(value)
+    for value in values[1::2]:
+        second.add(value)
 
-def run_all_tests():
+    ordered = sorted(values)
+    for q in [step / 1000 for step in range(1, 1001)] + list(QUANTILES):
+        exact = ordered[max(math.ceil(q * len(ordered)), 1) - 1]
+        estimate = whole.quantile(q)
+        if abs(estimate - exact) > RELATIVE_ACCURACY * exact:
+            return f"quantile {q} is {estimate}, exactly {exact}"
+
+    merged = first.merge(QuantileSketch.from_dict(second.to_dict()))
+    if merged.to_dict() != whole.to_dict():
+        return f"merged shards {merged.summary()}, whole sample {whole.summary()}"
+
+    # fcfs to 10: P1 finishes, P2 is selected at 5 and cut off, P3 never runs
+    lines = [b"runfor 10", b"use fcfs", b"process name P1 arrival 0 burst 5",
+             b"process name P2 arrival 1 burst 10", b"process name P3 arrival 2 burst 3"]
+    shards = []
+    for _ in range(2):
+        workload = parse_workload_lines(lines)
+        shards.append(run_statistics(workload.processes, workload.run_for, workload.algorithm))
+    summary = shards[0].summary()
+    counts = (summary["processes"], summary["finished"], summary["starved"], summary["unfinished"])
+    response = shards[0].sketches["response"]
+    if counts != (3, 1, 1, 1) or (response.count, response.minimum, response.maximum) != (2, 0, 4):
+        return f"cut off run has {summary}"
+    summary = shards[0].merge(shards[1]).summary()
+    counts = (summary["processes"], summary["finished"], summary["starved"], summary["unfinished"])
+    if counts != (6, 2, 2, 2) or summary["response"]["count"] != 4:
+        return f"merged cut off runs have {summary}"
+    return None
+
+PACKAGE_CHECKS = [check_statistics]
+
+def load_cache(use_cache):
+    if not use_cache or not os.path.exists(CACHE_FILE):
+        return {}
+    try:
+        with open(CACHE_FILE) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+def run_all_tests(use_cache=True, workers=None):
     input_dir = "inputs"
     expected_dir = "expected"
     actual_dir = "actual"
@@ -25,13 +307,79 @@ def run_all_tests():
     if not os.path.exists(actual_dir):
         os.makedirs(actual_dir)
 
-    for filename in os.listdir(input_dir):
+    scheduler_hash = scheduler_source_hash()
+    cache = load_cache(use_cache)
+
+    cases = []
+    for filename in sorted(os.listdir(input_dir)):
         if filename.endswith(".in"):
             input_file = os.path.join(input_dir, filename)
             expected_output_file = os.path.join(expected_dir, filename.replace(".in", ".out"))
             actual_output_file = os.path.join(actual_dir, filename.replace(".in", ".out"))
+            cases.append((input_file, expected_output_file, actual_output_file))
+
+    # Skip cases whose inputs, expected output and scheduler haven't changed
+    keys = {case[0]: case_key(case[0], case[1], scheduler_hash) for case in cases}
+    pending = [case for case in cases if keys[case[0]] not in cache]
 
-            run_test(input_file, expected_output_file, actual_output_file)
+    results = {}
+    if pending:
+        with ProcessPoolExecutor(workers) as pool:
+            outcomes = pool.map(run_test, *zip(*pending), chunksize=max(1, len(pending) // 64))
+            for case, outcome in zip(pending, outcomes):
+                results[case[0]] = outcome
+        for input_file, _, _ in pending:
+            if results[input_file][0]:
+                results[input_file] = run_sweep_test(input_file)
+
+    failures = 0
+    new_cache = {}
+    for input_file, _, _ in cases:
+        if input_file not in results:
+            print(f"{input_file}: Pass (cached)")
+            new_cache[keys[input_file]] = True
+            continue
+        passed, diff = results[input_file]
+        if passed:
+            print(f"{input_file}: Pass")
+            new_cache[keys[input_file]] = True
+        else:
+            failures += 1
+            print(f"{input_file}: Fail")
+            print(diff, end="")  # Print the differences
+
+    for check in PACKAGE_CHECKS:
+        key = hashlib.sha256(f"{scheduler_hash}:{check.__name__}".encode()).hexdigest()
+        if key in cache:
+            print(f"{check.__name__}: Pass (cached)")
+            new_cache[key] = True
+            continue
+        try:
+            message = check()
+        except Exception:
+            message = f"error:\n{traceback.format_exc()}"
+        if message is None:
+            print(f"{check.__name__}: Pass")
+            new_cache[key] = True
+        else:
+            failures += 1
+            print(f"{check.__name__}: Fail")
+            print(f"{message}\n", end="")
+
+    if use_cache:
+        with open(CACHE_FILE, 'w') as file:
+            json.dump(new_cache, file)
+
+    print(f"{len(cases) + len(PACKAGE_CHECKS) - failures} passed, {failures} failed")
+    return failures == 0
 
 if __name__ == "__main__":
-    run_all_tests()
\ No newline at end of file
+    # Run from the folder holding the scheduler so relative paths line up
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    use_cache = "--no-cache" not in sys.argv
+    workers = None
+    if "-j" in sys.argv and sys.argv.index("-j") + 1 < len(sys.argv):
+        workers = int(sys.argv[sys.argv.index("-j") + 1])
+
+    sys.exit(0 if run_all_tests(use_cache, workers) else 1)
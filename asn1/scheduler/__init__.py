@@ -0,0 +1,46 @@
+# Process scheduling simulator (FCFS, preemptive SJF, Round-Robin, MLFQ,
+# stride, lottery).
+#
+#     import scheduler
+#     result = scheduler.simulate("inputs/c5-rr.in", "rr", quantum=2)
+#     result.log, result.metrics
+#
+# Algorithms live in a registry (see register_algorithm). The sweep and
+# binary trace helpers pull in multiprocessing/mmap and are only imported
+# the first time one of their names is used.
+
+from . import algorithms, mlfq, proportional  # Registers the built-in algorithms
+from .checkpoint import Checkpoint, read_checkpoint, write_checkpoint
+from .log import ARRIVED, BLOCKED, BOOST, FINISHED, IDLE, SELECTED, STOLEN, WOKEN, on_core, render_log, summary_lines, write_output_file
+from .metrics import load_numpy, summary_metrics
+from .parse import Workload, WorkloadError, load_workload, parse_input_file
+from .registry import ALGORITHMS, Algorithm, get_algorithm, register_algorithm
+from .runner import (
+    SimulationResult, fifo_scheduler, rr_scheduler, run_scheduler, scheduler_events, simulate, sjf_scheduler,
+)
+from .table import NOT_STARTED, ArrivalCursor, Process, ProcessTable
+
+# Names served by submodules that are only imported on first use
+LAZY_NAMES = {
+    "sweep": "parallel",
+    "write_trace_file": "trace",
+    "read_trace_metadata": "trace",
+    "load_trace_events": "trace",
+    "iter_trace_events": "trace",
+    "render_trace": "trace",
+    "ResultCache": "cache",
+    "result_key": "cache",
+    "serve_session": "online",
+    "write_packed_workload": "packed",
+    "load_packed_workload": "packed",
+    "QuantileSketch": "stats",
+    "RunStatistics": "stats",
+    "run_statistics": "stats",
+    "Timeline": "timeline",
+}
+
+def __getattr__(name):
+    if name in LAZY_NAMES:
+        from importlib import import_module
+        return getattr(import_module(f".{LAZY_NAMES[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,289 @@
+# The built-in scheduling algorithms: FCFS, preemptive SJF and Round-Robin.
+# Each one is an event generator registered under its "use" name.
+
+import heapq
+from collections import deque
+
+from .log import IDLE, SELECTED
+from .metrics import load_numpy
+from .registry import register_algorithm
+from .smp import FifoRunQueue, ShortestRunQueue, smp_events
+from .table import NOT_STARTED
+
+# Closed-form FCFS. With processes in arrival order, each one starts at
+# max(previous finish, own arrival), so finish times are a max-plus scan:
+#   finish[k] = C[k] + max(0, max_{j<=k}(arrival[j] - C[j-1]))
+# where C is the running sum of bursts. That is a cumulative sum and a
+# cumulative max, which NumPy does in a couple of passes. Fills the same
+# columns as fifo_events without producing any log lines.
+def fifo_fast_path(processes, run_for):
+    numpy = load_numpy()
+    if numpy is None:
+        return fifo_fast_path_python(processes, run_for)
+    if len(processes) == 0:
+        return
+
+    arrival = numpy.frombuffer(processes.arrival, dtype=numpy.int64)
+    burst = numpy.frombuffer(processes.burst, dtype=numpy.int64)
+    order = numpy.argsort(arrival, kind="stable")  # Ties keep input order, like ArrivalCursor
+    sorted_arrival = arrival[order]
+    sorted_burst = burst[order]
+
+    cumulative = numpy.cumsum(sorted_burst)
+    finish = cumulative + numpy.maximum(numpy.maximum.accumulate(sorted_arrival - (cumulative - sorted_burst)), 0)
+    start_time = finish - sorted_burst
+
+    # Processes that start before run_for get selected; only some of them finish
+    started = start_time < run_for
+    finished = finish <= run_for
+    remaining = numpy.where(finished, 0, numpy.where(started, finish - run_for, sorted_burst))
+    turnaround = numpy.where(finished, finish - sorted_arrival, 0)
+
+    numpy.frombuffer(processes.start, dtype=numpy.int64)[order] = numpy.where(started, start_time, NOT_STARTED)
+    numpy.frombuffer(processes.response, dtype=numpy.int64)[order] = numpy.where(started, start_time - sorted_arrival, NOT_STARTED)
+    numpy.frombuffer(processes.remaining, dtype=numpy.int64)[order] = remaining
+    numpy.frombuffer(processes.turnaround, dtype=numpy.int64)[order] = turnaround
+    numpy.frombuffer(processes.wait, dtype=numpy.int64)[order] = numpy.where(finished, turnaround - sorted_burst, 0)
+
+# Same scan as fifo_fast_path, one process at a time, for when NumPy is missing
+def fifo_fast_path_python(processes, run_for):
+    arrival, burst = processes.arrival, processes.burst
+    finish = 0  # Finish time of the previous process
+    for index in sorted(range(len(processes)), key=arrival.__getitem__):
+        start_time = max(finish, arrival[index])
+        if start_time >= run_for:
+            break  # Nobody after this gets selected before the run ends
+        finish = start_time + burst[index]
+        processes.start[index] = start_time
+        processes.response[index] = start_time - arrival[index]
+        if finish <= run_for:
+            processes.remaining[index] = 0
+            processes.turnaround[index] = finish - arrival[index]
+            processes.wait[index] = processes.turnaround[index] - burst[index]
+        else:
+            processes.remaining[index] = finish - run_for
+
+# Multi-CPU versions of the three schedulers (see smp.py)
+def fifo_smp_events(processes, run_for, cpus):
+    return smp_events(processes, run_for, cpus, FifoRunQueue)
+
+def sjf_smp_events(processes, run_for, cpus):
+    return smp_events(processes, run_for, cpus, ShortestRunQueue, preemptive=True)
+
+def rr_smp_events(processes, run_for, cpus, quantum):
+    return smp_events(processes, run_for, cpus, FifoRunQueue, quantum=quantum)
+
+# First-Come First-Served (FIFO) scheduler
+#
+# Event-driven: instead of stepping the clock one unit at a time, jump
+# straight from one event (arrival, completion) to the next. Events that
+# land on the same time unit are logged arrivals first, then completion,
+# then selection.
+@register_algorithm("fcfs", lambda: ["Using First-Come First-Served"], fast_path=fifo_fast_path, smp=fifo_smp_events,
+                    resumable=True, online=True)
+def fifo_events(processes, run_for, checkpoint=None):
+    arrival = processes.arrival  # Column aliases
+    remaining, start, response = processes.remaining, processes.start, processes.response
+    current_time = 0  # Current time in the scheduler
+    ready_queue = processes.queue_class(deque)()  # Indices of arrived processes waiting for the CPU
+    arrivals = processes.arrival_cursor()  # Processes in arrival order
+    current = None  # Index of the selected process, None while idle
+    resumed = checkpoint is not None and checkpoint.resuming
+    if resumed:
+        current_time, current = checkpoint.restore(processes, arrivals)
+        ready_queue.extend(checkpoint.ready)
+
+    while current_time < run_for:
+        if resumed:
+            resumed = False  # Carry on from the checkpoint, after the selection
+        else:
+            # Log arrivals first, including those that arrived while CPU was busy
+            for event in arrivals.advance(current_time):
+                yield event
+                index = event[2]
+                ready_queue.append(index)
+
+            # Select the first process in arrival order; it runs its whole CPU burst
+            current = ready_queue.popleft() if ready_queue else None
+            if current is not None:
+                if start[current] == NOT_STARTED:
+                    start[current] = current_time
+                    response[current] = current_time - arrival[current]
+                yield (current_time, SELECTED, current, remaining[current])
+
+        if current is None:
+            # Nothing to run, so stay idle until the next arrival (or the end)
+            idle_until = run_for
+            if arrivals.next_time() is not None:
+                idle_until = min(arrivals.next_time(), run_for)
+            if checkpoint is not None and idle_until == run_for:
+                checkpoint.save(processes, current_time, current, ready_queue, arrivals)
+            yield (current_time, IDLE, -1, idle_until)
+            current_time = idle_until
+            continue
+
+        # Run the process for its burst time or until the scheduler run time ends
+        time_to_run = min(remaining[current], run_for - current_time)
+        if checkpoint is not None and time_to_run == run_for - current_time:
+            checkpoint.save(processes, current_time, current, ready_queue, arrivals)
+        current_time += time_to_run  # Jump to the completion (or end of run)
+        remaining[current] -= time_to_run  # Decrease remaining time
+
+        # Log arrivals during the process execution, up to the completion time
+        for event in arrivals.advance(min(current_time, run_for - 1)):
+            yield event
+            index = event[2]
+            ready_queue.append(index)
+
+        # End of the CPU burst: the process finishes, or blocks on its next I/O burst
+        if remaining[current] == 0:
+            yield arrivals.complete(current, current_time)
+
+# Preemptive Shortest Job First (SJF) scheduler
+#
+# The ready queue is a min-heap keyed on (remaining time, arrival, input
+# index), which is the same tie-breaking the old per-tick sort produced.
+# The running process is kept out of the heap, so its key never goes
+# stale, and preemption is only checked when new processes arrive.
+@register_algorithm("sjf", lambda: ["Using preemptive Shortest Job First"], smp=sjf_smp_events, resumable=True,
+                    online=True)
+def sjf_events(processes, run_for, checkpoint=None):
+    arrival = processes.arrival  # Column aliases
+    remaining, start, response = processes.remaining, processes.start, processes.response
+    current_time = 0  # Current time in the scheduler
+    ready_queue = []  # Heap of (remaining, arrival, index) entries
+    heappush, heappop = processes.heap_operations()
+    arrivals = processes.arrival_cursor()  # Processes in arrival order
+    current = None  # Index of the currently running process
+    resumed = checkpoint is not None and checkpoint.resuming
+    if resumed:
+        current_time, current = checkpoint.restore(processes, arrivals)
+        ready_queue = [(remaining[index], arrival[index], index) for index in checkpoint.ready]
+        heapq.heapify(ready_queue)
+
+    while current_time < run_for:
+        if resumed:
+            resumed = False  # Carry on from the checkpoint, after the selection
+        else:
+            # Log arrivals at current time step and push them onto the heap
+            arrived = False
+            for event in arrivals.advance(current_time):
+                yield event
+                index = event[2]
+                heappush(ready_queue, (remaining[index], arrival[index], index))
+                arrived = True
+
+            # Preempt only if one of the new arrivals beats the running process
+            if current is not None and arrived:
+                running_key = (remaining[current], arrival[current], current)
+                if ready_queue[0] < running_key:
+                    heappush(ready_queue, running_key)
+                    current = None
+
+            if current is None and ready_queue:
+                # Select process with shortest remaining time
+                current = heappop(ready_queue)[2]
+                yield (current_time, SELECTED, current, remaining[current])
+
+                # Set response time if not already set
+                if response[current] == NOT_STARTED:
+                    start[current] = current_time
+                    response[current] = current_time - arrival[current]
+
+        if current is None:
+            # If no process is ready, stay idle until the next arrival (or the end)
+            idle_until = run_for
+            if arrivals.next_time() is not None:
+                idle_until = min(arrivals.next_time(), run_for)
+            if checkpoint is not None and idle_until == run_for:
+                checkpoint.save(processes, current_time, current, (entry[2] for entry in ready_queue), arrivals)
+            yield (current_time, IDLE, -1, idle_until)
+            current_time = idle_until
+            continue
+
+        # Run until the process finishes, the next arrival, or the end of the run
+        next_event = min(current_time + remaining[current], run_for)
+        if arrivals.next_time() is not None:
+            next_event = min(next_event, arrivals.next_time())
+        if checkpoint is not None and next_event == run_for:
+            checkpoint.save(processes, current_time, current, (entry[2] for entry in ready_queue), arrivals)
+        remaining[current] -= next_event - current_time
+        current_time = next_event
+
+        # If the CPU burst is done, finish or block the process (after any arrivals at the same time)
+        if remaining[current] == 0:
+            for event in arrivals.advance(min(current_time, run_for - 1)):
+                yield event
+                index = event[2]
+                heappush(ready_queue, (remaining[index], arrival[index], index))
+            yield arrivals.complete(current, current_time)
+            current = None
+
+# Round-Robin (RR) scheduler
+#
+# Event-driven like fifo_events: each iteration covers a whole quantum
+# (or the rest of the burst), and arrivals inside that slice are logged
+# from the arrival cursor instead of being polled every time unit.
+@register_algorithm("rr", lambda quantum: ["Using Round-Robin", f"Quantum   {quantum}", ""], params=("quantum",),
+                    smp=rr_smp_events, resumable=True, online=True)
+def rr_events(processes, run_for, quantum, checkpoint=None):
+    arrival = processes.arrival  # Column aliases
+    remaining, start, response = processes.remaining, processes.start, processes.response
+    current_time = 0  # Current time in the scheduler
+    ready_queue = processes.queue_class(deque)()  # Ready queue of process indices
+    arrivals = processes.arrival_cursor()  # Processes in arrival order
+    current = None  # Index of the process in the current slice, None while idle
+    resumed = checkpoint is not None and checkpoint.resuming
+    if resumed:
+        current_time, current = checkpoint.restore(processes, arrivals)
+        ready_queue.extend(checkpoint.ready)
+
+    while current_time < run_for:
+        if resumed:
+            resumed = False  # Carry on from the checkpoint, after the selection
+        else:
+            # Add any new arrivals to the ready queue
+            for event in arrivals.advance(current_time):
+                yield event
+                index = event[2]
+                ready_queue.append(index)
+
+            current = ready_queue.popleft() if ready_queue else None  # Get the next process in the queue
+
+            # Log the process selection and set response time if it's the first time being selected
+            if current is not None:
+                if start[current] == NOT_STARTED:
+                    start[current] = current_time
+                    response[current] = current_time - arrival[current]
+                yield (current_time, SELECTED, current, remaining[current])
+
+        if current is None:
+            # If no process is ready, stay idle until the next arrival (or the end)
+            idle_until = run_for
+            if arrivals.next_time() is not None:
+                idle_until = min(arrivals.next_time(), run_for)
+            if checkpoint is not None and idle_until == run_for:
+                checkpoint.save(processes, current_time, current, ready_queue, arrivals)
+            yield (current_time, IDLE, -1, idle_until)
+            current_time = idle_until
+            continue
+
+        # Run the process for quantum or remaining burst time, in one step
+        time_to_run = min(quantum, remaining[current], run_for - current_time)
+        if checkpoint is not None and time_to_run == run_for - current_time:
+            checkpoint.save(processes, current_time, current, ready_queue, arrivals)
+        remaining[current] -= time_to_run
+        current_time += time_to_run
+
+        # Arrivals during the slice join the queue ahead of the preempted process
+        for event in arrivals.advance(min(current_time, run_for - 1)):
+            yield event
+            index = event[2]
+            ready_queue.append(index)
+
+        if remaining[current] == 0:
+            # If the CPU burst is done, the process finishes or blocks for I/O
+            yield arrivals.complete(current, current_time)
+        else:
+            # If the burst isn't done, add it back to the ready queue
+            ready_queue.append(current)
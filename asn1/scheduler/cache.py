@@ -0,0 +1,202 @@
+# On-disk cache of simulation results, so re-running the same workload
+# with the same algorithm and parameters reads the answer back instead of
+# simulating again.
+#
+# Entries are content addressed: the key hashes the parsed workload (not
+# the .in text, so comments and spacing don't matter), the runfor, CPU
+# count, algorithm and parameters, and the scheduler's own source. Each
+# entry is one file holding a JSON line with the summary metrics,
+# optionally followed by the zlib-compressed event log.
+#
+# Several jobs can share a cache directory. Entries are written to a
+# temporary file and renamed into place, so a reader sees a whole entry or
+# none; an unreadable or vanished entry is just a miss, and so is an entry
+# that can't be written (a full disk, or a cache path that isn't a
+# directory). A hit touches the entry's mtime. At most once a minute a put
+# also checks the directory's total size, and once it is past its bound the
+# least recently used entries are removed, so the bound can be overshot by
+# whatever is written between two checks.
+
+import glob
+import hashlib
+import io
+import json
+import os
+import time
+import zlib
+
+from .checkpoint import workload_fingerprint
+
+CACHE_ENV = "SCHEDULER_CACHE"  # Overrides the cache directory
+CACHE_SIZE_ENV = "SCHEDULER_CACHE_SIZE"  # Overrides the size bound, in bytes
+DEFAULT_CACHE_SIZE = 256 << 20
+STALE_SECONDS = 3600  # Age after which a temporary file is taken to be abandoned
+EVICT_SECONDS = 60  # Minimum time between two size checks of the directory
+EVICT_STAMP = "evicted"  # File in the cache directory whose mtime is the last check
+COMPRESS_LEVEL = 1  # zlib level of the stored logs: fast, since a miss pays for it
+COMPRESS_BATCH = 4096  # Log lines compressed at a time while they are written
+
+SCHEDULER_VERSION = None  # Hash of the package source, computed on first use
+
+# Hash of the scheduler package's source, so results from an older
+# scheduler are never served
+def scheduler_version():
+    global SCHEDULER_VERSION
+    if SCHEDULER_VERSION is None:
+        digest = hashlib.sha256()
+        package = os.path.dirname(os.path.abspath(__file__))
+        for path in sorted(glob.glob(os.path.join(package, "*.py"))):
+            with open(path, 'rb') as file:
+                digest.update(os.path.basename(path).encode() + b"\0" + file.read())
+        SCHEDULER_VERSION = digest.hexdigest()
+    return SCHEDULER_VERSION
+
+# Cache key of one run
+def result_key(processes, run_for, algorithm, params, cpus=1):
+    digest = hashlib.sha256(scheduler_version().encode())
+    digest.update(workload_fingerprint(processes, len(processes)).encode())
+    digest.update(json.dumps([run_for, cpus, algorithm, params], sort_keys=True).encode())
+    return digest.hexdigest()
+
+def default_cache_directory():
+    return os.environ.get(CACHE_ENV) or os.path.join(os.path.expanduser("~"), ".cache", "scheduler")
+
+class ResultCache:
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or default_cache_directory()
+        if max_bytes is None:
+            max_bytes = int(os.environ.get(CACHE_SIZE_ENV, DEFAULT_CACHE_SIZE))
+        self.max_bytes = max_bytes  # Bound on the total size of the entries
+
+    # Entries are spread over 256 subdirectories by the key's first byte
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    # Look up a run: (metrics, log lines or None), or None on a miss. With
+    # want_log set, an entry stored without its log is a miss too. The log
+    # is decompressed whole but its lines are produced lazily.
+    def get(self, key, want_log=False):
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as file:
+                metrics = json.loads(file.readline())
+                log = file.read()
+            os.utime(path)  # Most recently used
+        except (OSError, ValueError):
+            return None  # Missing, evicted meanwhile or half-written by a crashed job
+        if not log:
+            return None if want_log else (metrics, None)
+        if not want_log:
+            return metrics, None
+        try:
+            text = zlib.decompress(log)
+        except zlib.error:
+            return None
+        return metrics, (line.rstrip(b"\n").decode() for line in io.BytesIO(text))
+
+    # Store a run's metrics, and its log if given (a list of lines or a
+    # CompressedLog that has been run through). Returns whether the entry
+    # was written; a cache that can't be written to is only a miss later.
+    def put(self, key, metrics, log=None):
+        path = self.path(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temporary, 'wb') as file:
+                file.write(json.dumps(metrics).encode() + b"\n")
+                if isinstance(log, CompressedLog):
+                    file.write(log.data())
+                elif log is not None:
+                    file.write(zlib.compress("\n".join(log).encode(), COMPRESS_LEVEL))
+            os.replace(temporary, path)  # Readers see the old entry or the new one, never a mix
+        except OSError:
+            remove_quietly(temporary)
+            return False
+        if self.eviction_due():
+            self.evict()
+        return True
+
+    # Whether the size check is due, claiming it if so. Several jobs may
+    # claim the same check; evict copes with entries vanishing under it.
+    def eviction_due(self):
+        stamp = os.path.join(self.directory, EVICT_STAMP)
+        try:
+            if time.time() - os.stat(stamp).st_mtime < EVICT_SECONDS:
+                return False
+        except OSError:
+            pass  # No check yet
+        try:
+            with open(stamp, 'a'):
+                pass
+            os.utime(stamp)
+        except OSError:
+            return False
+        return True
+
+    # Remove least recently used entries until the cache fits its bound
+    def evict(self):
+        entries = []
+        total = 0
+        now = time.time()
+        for path in glob.glob(os.path.join(self.directory, "??", "*")):
+            try:
+                status = os.stat(path)
+            except OSError:
+                continue  # Removed by another job
+            if path.endswith(".tmp"):
+                # Another job's entry being written, or left behind by a crashed one
+                if now - status.st_mtime > STALE_SECONDS:
+                    remove_quietly(path)
+                continue
+            entries.append((status.st_mtime, status.st_size, path))
+            total += status.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            remove_quietly(path)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    # Remove every entry
+    def clear(self):
+        for path in glob.glob(os.path.join(self.directory, "??", "*")):
+            remove_quietly(path)
+
+# Log lines passed through on their way to the .out file, compressed as
+# they go so the log can be cached without holding its text in memory
+class CompressedLog:
+    def __init__(self, lines):
+        self.lines = lines
+        self.compressor = zlib.compressobj(COMPRESS_LEVEL)
+        self.chunks = []
+        self.separator = ""  # Goes before the next batch, once there is text
+
+    def __iter__(self):
+        batch = []
+        for line in self.lines:
+            batch.append(line)
+            if len(batch) == COMPRESS_BATCH:
+                self.compress(batch)
+                batch = []
+            yield line
+        self.compress(batch)
+
+    # Compress a batch of lines after the ones before it
+    def compress(self, batch):
+        if batch:
+            self.chunks.append(self.compressor.compress((self.separator + "\n".join(batch)).encode()))
+            self.separator = "\n"
+
+    # The compressed log, once every line has been iterated over
+    def data(self):
+        self.chunks.append(self.compressor.flush())
+        return b"".join(self.chunks)
+
+# Remove a file another job may have removed already
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,171 @@
+# Checkpoints: the state of a run, saved so that a later run with a larger
+# runfor (and possibly more processes appended to the workload) picks up
+# where it stopped instead of simulating from time zero again.
+#
+# A resumable scheduler calls save() right before the step that reaches
+# runfor, i.e. at the last point where its state is the same as in a run
+# with any later runfor. Everything logged before that point is identical
+# in both runs, so the resumed run restores that state, copies those lines
+# from the earlier .out and only simulates from there.
+#
+# File layout: a 24-byte header, a JSON block with the scalars and the
+# workload fingerprint, then the zlib-compressed state arrays.
+
+import hashlib
+import json
+import os
+import struct
+import zlib
+from array import array
+
+from .log import IDLE
+
+CHECKPOINT_MAGIC = b"SCHEDCKP"
+CHECKPOINT_VERSION = 1
+CHECKPOINT_HEADER = struct.Struct("<8sIQ4x")  # magic, version, JSON size
+CHECKPOINT_COLUMNS = ("remaining", "wait", "turnaround", "response", "start", "phase")
+
+# Hash of the workload rows a checkpoint was taken over (the first count
+# processes), so appended processes can be told apart from edits
+def workload_fingerprint(processes, count):
+    digest = hashlib.sha256()
+    digest.update("\n".join(processes.names[:count]).encode())
+    for column in (processes.arrival, processes.burst, processes.tickets):
+        digest.update(array('q', column[:count]).tobytes())
+    offset = processes.io_offset
+    digest.update(array('q', offset[:count + 1]).tobytes())
+    digest.update(array('q', processes.io_phases[:offset[count]]).tobytes())
+    return digest.hexdigest()
+
+class Checkpoint:
+    def __init__(self):
+        self.resuming = False  # Set by read_checkpoint: restore instead of starting at time zero
+        self.saved = False  # Whether the run got as far as saving (not with runfor 0)
+        self.lines = 0  # Output lines (header included) rendered so far
+        self.algorithm = None  # Algorithm and parameters the run used
+        self.params = {}
+        self.run_for = 0  # runfor of the run that saved the checkpoint
+        self.count = 0  # Number of processes in that run
+        self.fingerprint = None  # workload_fingerprint of those processes
+        self.time = 0  # Scheduler clock at the checkpoint
+        self.current = -1  # Process selected for the next step, -1 for idle
+        self.position = 0  # Processes handed out by the arrival cursor
+        self.log_lines = 0  # Output lines before the checkpoint
+        self.ready = array('q')  # Ready queue, in queue order
+        self.timers = []  # (wake time, process) for processes blocked on I/O
+        self.columns = {}  # Per-process columns at the checkpoint
+        self.output_file = None  # .out the run wrote, for a resumed run to copy from
+
+    # Called by a scheduler right before the step that reaches runfor
+    def save(self, processes, current_time, current, ready_queue, arrivals):
+        self.time = current_time
+        self.current = -1 if current is None else current
+        self.ready = array('q', ready_queue)
+        self.position = arrivals.position
+        self.timers = arrivals.wheel.pending() if arrivals.wheel is not None else []
+        self.columns = {name: array('q', getattr(processes, name)) for name in CHECKPOINT_COLUMNS}
+        self.log_lines = self.lines
+        self.saved = True
+
+    # Put the saved state back into a fresh table and arrival cursor, and
+    # return the clock and the selected process (None for idle). Processes
+    # appended since keep their fresh columns.
+    def restore(self, processes, arrivals):
+        for name, saved in self.columns.items():
+            column = getattr(processes, name)
+            column[:len(saved)] = saved
+        arrivals.position = self.position
+        for wake_time, index in self.timers:
+            arrivals.wheel.arm(index, wake_time)
+        self.resuming = False
+        return self.time, None if self.current == -1 else self.current
+
+    # Count the output lines of events as they stream past (an IDLE event
+    # is one line per idle time unit)
+    def count_lines(self, events):
+        for event in events:
+            self.lines += event[3] - event[0] if event[1] == IDLE else 1
+            yield event
+
+    # Make sure a workload can continue this checkpoint: same algorithm,
+    # the same processes first, appended ones arriving after it, and a
+    # runfor at least as long. Raises ValueError otherwise.
+    def check(self, processes, run_for, algorithm, params):
+        if algorithm != self.algorithm or params != self.params:
+            raise ValueError(f"Checkpoint was taken with {self.algorithm} {self.params}, not {algorithm} {params}.")
+        if run_for < self.run_for:
+            raise ValueError(f"Cannot resume a checkpoint at runfor {self.run_for} with a shorter runfor {run_for}.")
+        if len(processes) < self.count or workload_fingerprint(processes, self.count) != self.fingerprint:
+            raise ValueError("Workload does not start with the processes the checkpoint was taken over.")
+        for index in range(self.count, len(processes)):
+            if processes.arrival[index] < self.run_for:
+                raise ValueError(f"Appended process {processes.names[index]} arrives before time {self.run_for}.")
+
+# Write a checkpoint once the run that saved to it has finished
+def write_checkpoint(checkpoint_file, checkpoint, processes):
+    metadata = {
+        "algorithm": checkpoint.algorithm,
+        "params": checkpoint.params,
+        "run_for": checkpoint.run_for,
+        "count": len(processes),
+        "fingerprint": workload_fingerprint(processes, len(processes)),
+        "time": checkpoint.time,
+        "current": checkpoint.current,
+        "position": checkpoint.position,
+        "log_lines": checkpoint.log_lines,
+        "saved": checkpoint.saved,
+        "output_file": checkpoint.output_file,
+        "ready": len(checkpoint.ready),
+        "timers": len(checkpoint.timers),
+    }
+    state = array('q', checkpoint.ready)
+    state.extend(entry[0] for entry in checkpoint.timers)
+    state.extend(entry[1] for entry in checkpoint.timers)
+    for name in CHECKPOINT_COLUMNS if checkpoint.saved else ():
+        state.extend(checkpoint.columns[name])
+
+    encoded = json.dumps(metadata).encode()
+    temporary = f"{checkpoint_file}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as file:
+        file.write(CHECKPOINT_HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, len(encoded)))
+        file.write(encoded)
+        file.write(zlib.compress(state.tobytes()))
+    os.replace(temporary, checkpoint_file)  # Never leave a half-written checkpoint behind
+
+# Read a checkpoint written by write_checkpoint, ready to resume from;
+# raises ValueError if the file isn't one
+def read_checkpoint(checkpoint_file):
+    with open(checkpoint_file, 'rb') as file:
+        magic, version, size = CHECKPOINT_HEADER.unpack(file.read(CHECKPOINT_HEADER.size))
+        if magic != CHECKPOINT_MAGIC or version != CHECKPOINT_VERSION:
+            raise ValueError(f"{checkpoint_file} is not a version {CHECKPOINT_VERSION} scheduler checkpoint.")
+        metadata = json.loads(file.read(size))
+        state = array('q', zlib.decompress(file.read()))
+
+    checkpoint = Checkpoint()
+    checkpoint.resuming = True
+    for key in ("algorithm", "params", "run_for", "count", "fingerprint", "time", "current", "position", "log_lines", "saved", "output_file"):
+        setattr(checkpoint, key, metadata[key])
+    ready, timers, count = metadata["ready"], metadata["timers"], metadata["count"]
+    checkpoint.ready = state[:ready]
+    checkpoint.timers = list(zip(state[ready:ready + timers], state[ready + timers:ready + 2 * timers]))
+    start = ready + 2 * timers
+    for name in CHECKPOINT_COLUMNS if checkpoint.saved else ():
+        checkpoint.columns[name] = state[start:start + count]
+        start += count
+    return checkpoint
+
+# Lines of a resumed run's .out: its header, the lines the earlier run
+# logged before the checkpoint (read back from that run's .out), then the
+# resumed run's own lines after its header
+def resumed_log(previous_output_file, checkpoint, header_size, log):
+    log = iter(log)
+    for _ in range(header_size):
+        yield next(log)
+    with open(previous_output_file) as file:
+        for number, line in enumerate(file):
+            if number >= checkpoint.log_lines:
+                break
+            if number >= header_size:
+                yield line.rstrip("\n")
+    yield from log
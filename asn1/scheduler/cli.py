@@ -0,0 +1,228 @@
+# Command line interface (scheduler-gpt.py and python -m scheduler)
+
+import os
+import sys
+
+from .checkpoint import Checkpoint, read_checkpoint, resumed_log, write_checkpoint
+from .log import write_output_file
+from .metrics import summary_metrics
+from .parse import load_workload
+from .runner import run_scheduler, scheduler_events
+
+def main(args):
+    # --summary skips the event log and prints the summary metrics instead
+    args = list(args)
+    summary_only = "--summary" in args
+    if summary_only:
+        args.remove("--summary")
+
+    # --stats writes aggregate wait/turnaround/response statistics (see
+    # stats.py) instead of the event log, and prints their summary
+    write_stats = "--stats" in args
+    if write_stats:
+        args.remove("--stats")
+
+    # --trace writes a binary event trace instead of the .out text, and
+    # --render turns such a trace back into the .out text
+    write_trace = "--trace" in args
+    if write_trace:
+        args.remove("--trace")
+    render = "--render" in args
+    if render:
+        args.remove("--render")
+
+    # --no-cache always simulates, instead of reusing a cached result of
+    # the same run (see cache.py)
+    use_cache = "--no-cache" not in args
+    if not use_cache:
+        args.remove("--no-cache")
+
+    # --sweep ALGS [--quanta Q1,Q2,...] runs a parameter sweep over the workload
+    sweep_algorithms = None
+    sweep_quanta = []
+    if "--sweep" in args and args.index("--sweep") + 1 < len(args):
+        position = args.index("--sweep")
+        sweep_algorithms = args[position + 1].split(",")
+        del args[position:position + 2]
+    if "--quanta" in args and args.index("--quanta") + 1 < len(args):
+        position = args.index("--quanta")
+        sweep_quanta = [int(quantum) for quantum in args[position + 1].split(",")]
+        del args[position:position + 2]
+
+    # --checkpoint FILE saves the run's state after it, and --resume FILE
+    # continues the run saved there up to this input's (longer) runfor
+    checkpoint_file = resume_file = None
+    if "--checkpoint" in args and args.index("--checkpoint") + 1 < len(args):
+        position = args.index("--checkpoint")
+        checkpoint_file = args[position + 1]
+        del args[position:position + 2]
+    if "--resume" in args and args.index("--resume") + 1 < len(args):
+        position = args.index("--resume")
+        resume_file = args[position + 1]
+        del args[position:position + 2]
+
+    # --profile runs phase by phase with counters and writes a JSON report
+    # next to the .out; --cprofile FILE also runs it under cProfile
+    profile = "--profile" in args
+    if profile:
+        args.remove("--profile")
+    cprofile_file = None
+    if "--cprofile" in args and args.index("--cprofile") + 1 < len(args):
+        position = args.index("--cprofile")
+        cprofile_file = args[position + 1]
+        del args[position:position + 2]
+        profile = True
+
+    if len(args) != 1:
+        print("Usage: scheduler-gpt.py <input file> [--summary | --stats | --trace] [--sweep ALGS [--quanta Q1,Q2,...]] [--no-cache]")
+        print("       scheduler-gpt.py <input file> [--checkpoint FILE] [--resume FILE]")
+        print("       scheduler-gpt.py <input file> --profile [--cprofile FILE]")
+        print("       scheduler-gpt.py --render <trace file>")
+        sys.exit(1)
+
+    input_file = args[0]
+    extension = ".trace" if render else ".in"
+    if not render and input_file.endswith(".wl"):
+        extension = ".wl"  # Packed workload (see packed.py)
+    if not input_file.endswith(extension):
+        print(f"Error: Input file must have a {extension} extension.")
+        sys.exit(1)
+
+    # Ensure output file is written to the "actual" folder
+    base_filename = os.path.basename(input_file).replace(extension, ".out")
+    output_file = os.path.join("actual", base_filename)
+
+    # Create 'actual' directory if it doesn't exist
+    if not os.path.exists("actual"):
+        os.makedirs("actual")
+
+    # Render a binary trace back into the .out text
+    if render:
+        from .trace import render_trace
+        try:
+            write_output_file(output_file, render_trace(input_file))
+        except ValueError as error:
+            print(f"Error: {error}")
+            sys.exit(1)
+        sys.exit(0)
+
+    # Profile a normal run; the cache is left alone so the run is real
+    if profile:
+        from .profiling import profile_run, write_report
+        run = lambda workload: scheduler_events(workload.processes, workload.run_for, workload.algorithm, workload.cpus, **workload.params)
+        try:
+            report = profile_run(input_file, load_workload, run, lambda lines: write_output_file(output_file, lines), cprofile_file)
+        except (ValueError, OSError) as error:
+            print(f"Error: {error}")
+            sys.exit(1)
+        write_report(output_file.replace(".out", ".profile.json"), report)
+        sys.exit(0)
+
+    # Parse the input file to get the process table, run time, algorithm and its parameters
+    try:
+        workload = load_workload(input_file)
+    except (ValueError, OSError) as error:
+        print(f"Error: {error}")
+        sys.exit(1)
+    processes, run_for, algorithm, params = workload.processes, workload.run_for, workload.algorithm, workload.params
+
+    # Print one metrics row per configuration and skip the normal run
+    if sweep_algorithms is not None:
+        from .parallel import sweep
+        try:
+            rows = sweep(processes, run_for, sweep_algorithms, sweep_quanta or [params.get("quantum", 1)], cpus=workload.cpus,
+                         params=params)
+        except ValueError as error:
+            print(f"Error: {error}")
+            sys.exit(1)
+        columns = list(rows[0].keys()) if rows else []
+        print("\t".join(columns))
+        for row in rows:
+            print("\t".join(str(row[column]) for column in columns))
+        sys.exit(0)
+
+    # Write the events as a binary trace next to where the .out would go
+    if write_trace:
+        from .trace import write_trace_file
+        try:
+            header, events = scheduler_events(processes, run_for, algorithm, workload.cpus, **params)
+        except ValueError as error:
+            print(f"Error: {error}")
+            sys.exit(1)
+        write_trace_file(output_file.replace(".out", ".trace"), processes, run_for, header, events)
+        sys.exit(0)
+
+    # Write the run's statistics next to where the .out would go
+    if write_stats:
+        from .stats import run_statistics, statistics_lines, write_statistics
+        try:
+            statistics = run_statistics(processes, run_for, algorithm, workload.cpus, **params)
+        except ValueError as error:
+            print(f"Error: {error}")
+            sys.exit(1)
+        write_statistics(output_file.replace(".out", ".stats.json"), statistics)
+        for line in statistics_lines(statistics.summary()):
+            print(line)
+        sys.exit(0)
+
+    # Run with a checkpoint: resume from the saved state and copy the lines
+    # logged before it from the earlier .out, then save the new state (to
+    # the same file unless --checkpoint names another one)
+    if checkpoint_file is not None or resume_file is not None:
+        try:
+            checkpoint = read_checkpoint(resume_file) if resume_file is not None else Checkpoint()
+            previous_output = checkpoint.output_file
+            output_log = run_scheduler(processes, run_for, algorithm, cpus=workload.cpus, checkpoint=checkpoint, **params)
+            if checkpoint.resuming:
+                header_size = 1 + len(scheduler_events(processes, run_for, algorithm, **params)[0])
+                output_log = resumed_log(previous_output, checkpoint, header_size, output_log)
+        except (ValueError, OSError) as error:
+            print(f"Error: {error}")
+            sys.exit(1)
+        # The earlier .out may be the one being rewritten, so write next to it first
+        temporary = f"{output_file}.{os.getpid()}.tmp"
+        write_output_file(temporary, output_log)
+        os.replace(temporary, output_file)
+        checkpoint.output_file = output_file
+        write_checkpoint(checkpoint_file or resume_file, checkpoint, processes)
+        sys.exit(0)
+
+    # Reuse the result of an identical earlier run if there is one
+    cache = key = None
+    if use_cache:
+        from .cache import CompressedLog, ResultCache, result_key
+        cache = ResultCache()
+        key = result_key(processes, run_for, algorithm, params, workload.cpus)
+        cached = cache.get(key, want_log=not summary_only)
+        if cached is not None:
+            metrics, output_log = cached
+            if summary_only:
+                print_metrics(metrics)
+            else:
+                write_output_file(output_file, output_log)
+            sys.exit(0)
+
+    # Run the selected scheduling algorithm
+    try:
+        output_log = run_scheduler(processes, run_for, algorithm, trace=not summary_only, cpus=workload.cpus, **params)
+    except ValueError as error:
+        print(f"Error: {error}")
+        sys.exit(1)
+
+    if summary_only:
+        metrics = summary_metrics(processes, run_for)
+        print_metrics(metrics)
+        if cache is not None:
+            cache.put(key, metrics)
+        sys.exit(0)
+
+    # Write the output to the corresponding file
+    if cache is not None:
+        output_log = CompressedLog(output_log)  # Compressed for the cache on the way
+    write_output_file(output_file, output_log)
+    if cache is not None:
+        cache.put(key, summary_metrics(processes, run_for), output_log)
+
+def print_metrics(metrics):
+    for key, value in metrics.items():
+        print(f"{key} {value}")
@@ -0,0 +1,84 @@
+# Scheduler events and the .out text rendered from them
+
+# Scheduler events. Schedulers yield (time, kind, index, value) tuples
+# instead of formatted strings; index is the process row (or -1) and value
+# is the burst shown on a selection, or the end of an idle span. A whole
+# stretch of idle time is a single IDLE event, which render_log expands
+# into one "Idle" line per time unit only when the text is written.
+ARRIVED = 0
+SELECTED = 1
+FINISHED = 2
+IDLE = 3
+BOOST = 4  # Priority boost (MLFQ)
+STOLEN = 5  # Process taken from another core's run queue (value is that core)
+BLOCKED = 6  # CPU burst done, process waits for I/O (value is the wake time)
+WOKEN = 7  # I/O done, process is ready again
+
+# With several CPUs, events that happen on a core carry it in the kind:
+# kind | (core + 1) << CORE_SHIFT. Plain kinds (arrivals, and every event
+# of a one-CPU run) have no core bits, so they render exactly as before.
+CORE_SHIFT = 8
+KIND_MASK = (1 << CORE_SHIFT) - 1
+
+def on_core(kind, core):
+    return kind | (core + 1) << CORE_SHIFT
+
+# Turn a scheduler's events into the lines of a .out file, lazily. The
+# summary is only formatted once the events have run to the end.
+def render_log(processes, run_for, header, events):
+    yield f"  {len(processes)} processes"
+    yield from header
+    yield from event_lines(processes.names, events)
+    yield from summary_lines(processes, run_for)
+
+# Log lines for a stream of events, without the header and summary
+def event_lines(names, events):
+    for time, kind, index, value in events:
+        if kind == ARRIVED:
+            yield f"Time {time:>3} : {names[index]} arrived"
+        elif kind == SELECTED:
+            yield f"Time {time:>3} : {names[index]} selected (burst {value:>3})"
+        elif kind == FINISHED:
+            yield f"Time {time:>3} : {names[index]} finished"
+        elif kind == BLOCKED:
+            yield f"Time {time:>3} : {names[index]} blocked (I/O {value - time:>3})"
+        elif kind == WOKEN:
+            yield f"Time {time:>3} : {names[index]} I/O done"
+        elif kind == BOOST:
+            yield f"Time {time:>3} : Priority boost"
+        elif kind == IDLE:
+            for t in range(time, value):
+                yield f"Time {t:>3} : Idle"
+        else:
+            yield core_line(names, time, kind, index, value)
+
+# Line for an event tagged with a core. An idle core is a single line,
+# since it stays idle until a later line shows it picking something up.
+def core_line(names, time, kind, index, value):
+    prefix = f"Time {time:>3} : CPU {(kind >> CORE_SHIFT) - 1:>2} :"
+    kind &= KIND_MASK
+    if kind == SELECTED:
+        return f"{prefix} {names[index]} selected (burst {value:>3})"
+    elif kind == FINISHED:
+        return f"{prefix} {names[index]} finished"
+    elif kind == BLOCKED:
+        return f"{prefix} {names[index]} blocked (I/O {value - time:>3})"
+    elif kind == STOLEN:
+        return f"{prefix} {names[index]} stolen from CPU {value:>2}"
+    return f"{prefix} Idle"
+
+# "Finished at" line and one wait/turnaround/response line per process, by name
+def summary_lines(processes, run_for):
+    names, wait, turnaround, response = processes.names, processes.wait, processes.turnaround, processes.response
+    lines = [f"Finished at time {run_for:>3}", ""]
+    for index in sorted(range(len(processes)), key=names.__getitem__):
+        response_time = max(response[index], 0)  # Never-selected processes report 0
+        lines.append(f"{names[index]} wait {wait[index]:>3} turnaround {turnaround[index]:>3} response {response_time:>3}")
+    return lines
+
+# Write the output to a .out file. output_log can be any iterable of
+# lines (such as run_scheduler's stream); it is consumed one line at a time
+# through a large write buffer, so memory stays flat however long the run.
+def write_output_file(output_file, output_log):
+    with open(output_file, 'w', buffering=1 << 20) as file:
+        file.writelines(line + "\n" for line in output_log)
@@ -0,0 +1,52 @@
+# Summary metrics over a finished run
+
+from .table import NOT_STARTED
+
+# Summary numbers over the whole run, computed from the table columns. Wait
+# and turnaround cover finished processes, response covers selected ones.
+# Uses NumPy reductions when available, plain loops otherwise.
+def summary_metrics(processes, run_for):
+    numpy = load_numpy()
+    if numpy is not None and len(processes) > 0:
+        remaining = numpy.frombuffer(processes.remaining, dtype=numpy.int64)
+        response = numpy.frombuffer(processes.response, dtype=numpy.int64)
+        finished = remaining == 0
+        started = response != NOT_STARTED
+        wait = numpy.frombuffer(processes.wait, dtype=numpy.int64)[finished]
+        turnaround = numpy.frombuffer(processes.turnaround, dtype=numpy.int64)[finished]
+        response = response[started]
+        finished_count, started_count = int(finished.sum()), int(started.sum())
+        totals = (int(wait.sum()), int(turnaround.sum()), int(response.sum()))
+        maxima = tuple(int(column.max()) if column.size else 0 for column in (wait, turnaround, response))
+    else:
+        finished = [index for index in range(len(processes)) if processes.remaining[index] == 0]
+        started = [index for index in range(len(processes)) if processes.response[index] != NOT_STARTED]
+        finished_count, started_count = len(finished), len(started)
+        columns = (
+            [processes.wait[index] for index in finished],
+            [processes.turnaround[index] for index in finished],
+            [processes.response[index] for index in started],
+        )
+        totals = tuple(sum(column) for column in columns)
+        maxima = tuple(max(column, default=0) for column in columns)
+
+    return {
+        "processes": len(processes),
+        "finished": finished_count,
+        "selected": started_count,
+        "throughput": finished_count / run_for if run_for else 0.0,
+        "avg_wait": totals[0] / finished_count if finished_count else 0.0,
+        "avg_turnaround": totals[1] / finished_count if finished_count else 0.0,
+        "avg_response": totals[2] / started_count if started_count else 0.0,
+        "max_wait": maxima[0],
+        "max_turnaround": maxima[1],
+        "max_response": maxima[2],
+    }
+
+# NumPy is optional: the fast paths use it when it is installed
+def load_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
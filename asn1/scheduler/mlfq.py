@@ -0,0 +1,168 @@
+# Multi-Level Feedback Queue (MLFQ) scheduler.
+#
+# New processes enter the top level (0). A process that uses up its
+# level's quantum drops one level; one that is preempted keeps its level
+# and what is left of its quantum, and one that blocks for I/O keeps its
+# level and gets a fresh quantum when it wakes. Every "boost" time units all processes
+# go back to the top level. Selection, demotion and boosts are all cheap:
+#   - a bitmap has bit i set while level i is non-empty, so the highest
+#     non-empty level is its lowest set bit, found in O(1)
+#   - each level is a queue of deque segments, so a boost splices the
+#     lower levels onto level 0 in O(levels) without touching processes
+#   - per-process levels are only refreshed lazily: a boost bumps an epoch
+#     and a process whose epoch is stale is treated as level 0
+
+from array import array
+from collections import deque
+
+from .log import BOOST, IDLE, SELECTED, WOKEN
+from .registry import register_algorithm
+from .table import NOT_STARTED
+
+# FIFO queue of process indices stored as a chain of deque segments, so a
+# whole queue can be appended to another one in O(1)
+class LevelQueue:
+    def __init__(self):
+        self.segments = deque()  # Non-empty deques, oldest first
+
+    def __bool__(self):
+        return bool(self.segments)
+
+    def append(self, index):
+        if not self.segments:
+            self.segments.append(deque())
+        self.segments[-1].append(index)
+
+    def popleft(self):
+        segment = self.segments[0]
+        index = segment.popleft()
+        if not segment:
+            self.segments.popleft()
+        return index
+
+    # Move every entry of other to the end of this queue, leaving other empty
+    def splice(self, other):
+        self.segments.extend(other.segments)
+        other.segments = deque()
+
+def mlfq_header(quanta, levels, boost):
+    header = ["Using Multi-Level Feedback Queue", f"Levels   {len(quanta)}", f"Quanta   {' '.join(str(quantum) for quantum in quanta)}"]
+    if boost:
+        header.append(f"Boost   {boost}")
+    return header + [""]
+
+def mlfq_validate(quanta, levels, boost):
+    if not quanta or min(quanta) <= 0:
+        raise ValueError("MLFQ quanta must be positive.")
+    if levels is not None and levels != len(quanta):
+        raise ValueError(f"MLFQ has {levels} levels but {len(quanta)} quanta.")
+    if boost < 0:
+        raise ValueError("MLFQ boost period cannot be negative.")
+
+@register_algorithm("mlfq", mlfq_header, params=("quanta",), defaults={"levels": None, "boost": 0}, validate=mlfq_validate)
+def mlfq_events(processes, run_for, quanta, levels=None, boost=0):
+    arrival = processes.arrival  # Column aliases
+    remaining, start, response = processes.remaining, processes.start, processes.response
+    count = len(processes)
+    level = array('q', bytes(8 * count))  # Level of each process (valid only for the current epoch)
+    allotment = array('q', bytes(8 * count))  # Time left in its level's quantum
+    epoch_of = array('q', bytes(8 * count))  # Boost epoch in which level/allotment were set
+    queues = [processes.queue_class(LevelQueue)() for _ in quanta]  # One FIFO per level, 0 = highest priority
+    bottom = len(quanta) - 1
+    nonempty = 0  # Bit i is set while queues[i] has entries
+    epoch = 0  # Number of boosts so far
+    next_boost = boost if boost else None  # Time of the next priority boost
+    current_time = 0  # Current time in the scheduler
+    current = None  # Index of the running process
+    arrivals = processes.arrival_cursor()  # Processes in arrival order
+
+    # Queue an arriving process at the top level with a full quantum. One
+    # back from I/O keeps its level (unless a boost happened meanwhile),
+    # with a fresh quantum. Returns the bit of the level it went to.
+    def admit(event):
+        index = event[2]
+        if event[1] == WOKEN and epoch_of[index] == epoch:
+            target = level[index]
+        else:
+            target = level[index] = 0
+            epoch_of[index] = epoch
+        allotment[index] = quanta[target]
+        queues[target].append(index)
+        return 1 << target
+
+    while current_time < run_for:
+        # New arrivals start at the top level with a full quantum
+        for event in arrivals.advance(current_time):
+            yield event
+            nonempty |= admit(event)
+
+        # Priority boost: splice every level onto level 0 and start a new epoch
+        if next_boost is not None and current_time >= next_boost:
+            if nonempty or current is not None:
+                yield (current_time, BOOST, -1, 0)
+                for lower in range(1, len(queues)):
+                    queues[0].splice(queues[lower])
+                nonempty = 1 if queues[0] else 0
+                epoch += 1
+                if current is not None:
+                    level[current], allotment[current], epoch_of[current] = 0, quanta[0], epoch
+            next_boost += boost * ((current_time - next_boost) // boost + 1)
+
+        # A process waiting on a higher level preempts the running one
+        if current is not None and nonempty & ((1 << level[current]) - 1):
+            queues[level[current]].append(current)
+            nonempty |= 1 << level[current]
+            current = None
+
+        if current is None:
+            if not nonempty:
+                # If no process is ready, stay idle until the next arrival (or the end)
+                idle_until = run_for
+                if arrivals.next_time() is not None:
+                    idle_until = min(arrivals.next_time(), run_for)
+                yield (current_time, IDLE, -1, idle_until)
+                if next_boost is not None and next_boost < idle_until:
+                    # Boosts while the system is empty do nothing
+                    next_boost += boost * ((idle_until - next_boost + boost - 1) // boost)
+                current_time = idle_until
+                continue
+
+            # Highest non-empty level is the lowest set bit of the bitmap
+            top = (nonempty & -nonempty).bit_length() - 1
+            current = queues[top].popleft()
+            if not queues[top]:
+                nonempty &= ~(1 << top)
+            if epoch_of[current] != epoch:
+                # Boosted while waiting
+                level[current], allotment[current], epoch_of[current] = 0, quanta[0], epoch
+            yield (current_time, SELECTED, current, remaining[current])
+
+            if start[current] == NOT_STARTED:
+                start[current] = current_time
+                response[current] = current_time - arrival[current]
+
+        # Run until the quantum or burst ends, or something can preempt/boost
+        next_event = min(current_time + min(allotment[current], remaining[current]), run_for)
+        if next_boost is not None:
+            next_event = min(next_event, next_boost)
+        if level[current] > 0 and arrivals.next_time() is not None:
+            next_event = min(next_event, arrivals.next_time())  # Arrivals outrank lower levels
+        remaining[current] -= next_event - current_time
+        allotment[current] -= next_event - current_time
+        current_time = next_event
+
+        # Arrivals during a top-level slice just queue behind it
+        for event in arrivals.advance(min(current_time, run_for - 1)):
+            yield event
+            nonempty |= admit(event)
+
+        if remaining[current] == 0:
+            yield arrivals.complete(current, current_time)
+            current = None
+        elif allotment[current] == 0:
+            # Used its whole quantum: drop a level (the bottom level is round robin)
+            level[current] = min(level[current] + 1, bottom)
+            allotment[current] = quanta[level[current]]
+            queues[level[current]].append(current)
+            nonempty |= 1 << level[current]
+            current = None
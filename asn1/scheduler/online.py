@@ -0,0 +1,330 @@
+# Online scheduling service: processes come in one "process" line at a
+# time (on stdin, or over a TCP or Unix socket connection), and the log
+# lines come back as soon as the scheduler has decided them.
+#
+#     python -m scheduler.online rr --quantum 2 < arrivals.txt
+#     python -m scheduler.online sjf --listen tcp:127.0.0.1:7000
+#     python -m scheduler.online fcfs --listen unix:/tmp/scheduler.sock --tick 0.1
+#
+# Input lines are the workload's own "process" lines, plus "time T" (no
+# process will arrive before T) and "end". Each connection is a separate
+# run. Bad input lines are reported on stderr and skipped.
+#
+# Only the algorithms registered as online run here: lottery and MLFQ size
+# their per-process structures from the table when the run starts, which
+# is empty here.
+#
+# The schedulers are the same event generators as offline. They run on a
+# thread of their own over a live process table, whose arrival cursor
+# blocks until what the scheduler asks for is known:
+#   - simulated time (the default): processes come in arrival order, so
+#     once one arriving at A is in, every arrival before A is known. A
+#     process line arriving before an earlier line's process is rejected,
+#     since the run may already be past it; a workload whose process lines
+#     aren't sorted by arrival has to be sorted before it is piped in.
+#   - wall-clock time (--tick SECONDS): a process arrives at the time unit
+#     in which its line is received, whatever its arrival field says, and
+#     time unit t is known once it is over
+# When the scheduler asks for the next arrival and none is known yet, the
+# cursor answers with the time up to which it knows there is none. The
+# scheduler then idles (or runs) up to that point and asks again, which
+# logs the same lines as knowing the real arrival up front, so an event
+# waits for at most the input that decides it (or one tick).
+#
+# Backpressure: log lines go through a bounded queue to the connection,
+# so a slow consumer stalls the scheduler thread, and once enough
+# received processes are waiting for the scheduler, reading stops until
+# it catches up.
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+
+from .log import IDLE, event_lines, summary_lines
+from .parse import parse_process
+from .registry import ALGORITHMS, algorithm_params
+from .table import ArrivalCursor, ProcessTable
+from .timerwheel import TimerWheel
+
+EVENT_BUFFER = 1024  # Batches of log lines queued for the consumer before the scheduler waits
+ARRIVAL_BACKLOG = 1024  # Processes received but not yet handed out before reading pauses
+FOREVER = sys.maxsize  # runfor of a run without one: it ends once the input has and nothing is left to run
+
+# Processes received so far, shared by the event loop (which adds them)
+# and the scheduler thread (which waits for them)
+class ArrivalFeed:
+    def __init__(self, loop, tick=None):
+        self.loop = loop
+        self.tick = tick  # Seconds per time unit on the wall clock, None for simulated time
+        self.started = time.monotonic()
+        self.condition = threading.Condition()
+        self.order = []  # Process indices in arrival order
+        self.watermark = 0  # Simulated time: every process arriving before this has been received
+        self.closed = False  # Input is over
+        self.cancelled = False  # Consumer is gone; the scheduler thread should stop
+        self.paused = False  # Reading waits for the scheduler to catch up
+        self.handed_out = 0  # Processes the scheduler has been handed
+        self.room = asyncio.Event()  # Set while reading may go on
+        self.room.set()
+
+    # Wall-clock time unit we are in
+    def now(self):
+        return int((time.monotonic() - self.started) / self.tick)
+
+    # Time before which every arrival is known
+    def known_before(self):
+        if self.tick is not None:
+            return self.now()  # Keeps pacing the run even after the input is over
+        return FOREVER if self.closed else self.watermark
+
+    # Seconds until time unit t starts on the wall clock (None: until notified)
+    def timeout(self, t):
+        if self.tick is None:
+            return None
+        return max(t * self.tick - (time.monotonic() - self.started), 0)
+
+    # Called from the event loop: add a parsed process line to the table
+    def add(self, processes, name, arrival, bursts, tickets):
+        with self.condition:
+            if self.tick is not None:
+                arrival = self.now()
+            elif arrival < self.watermark:
+                raise ValueError(f"Process {name} arrives at {arrival}, before time {self.watermark}.")
+            else:
+                self.watermark = arrival
+            self.order.append(processes.add(name, arrival, bursts, tickets))
+            self.condition.notify_all()
+            if len(self.order) - self.handed_out >= ARRIVAL_BACKLOG:
+                self.paused = True
+                self.room.clear()
+
+    # Called from the event loop on a "time T" line
+    def advance_to(self, t):
+        with self.condition:
+            self.watermark = max(self.watermark, t)
+            self.condition.notify_all()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def cancel(self):
+        with self.condition:
+            self.cancelled = True
+            self.closed = True
+            self.condition.notify_all()
+
+    # Called from the scheduler thread: wait until every arrival up to t is known
+    def wait_until_known(self, t):
+        with self.condition:
+            while not self.cancelled and self.known_before() <= t:
+                self.condition.wait(self.timeout(t + 1))
+
+    # Called from the scheduler thread: wait until a process is received
+    # past position, or every arrival up to now is known
+    def wait_for_next(self, position, now):
+        with self.condition:
+            while not self.closed and len(self.order) <= position and self.known_before() <= now:
+                self.condition.wait(self.timeout(now + 1))
+
+    # Called from the scheduler thread once processes up to position have been handed out
+    def consumed(self, position):
+        with self.condition:
+            self.handed_out = position
+            if self.paused and len(self.order) - position < ARRIVAL_BACKLOG:
+                self.paused = False
+                self.loop.call_soon_threadsafe(self.room.set)
+
+# Arrival cursor over a live table (see the top of the file)
+class LiveArrivalCursor(ArrivalCursor):
+    def __init__(self, table, feed):
+        self.table = table
+        self.arrival = table.arrival
+        self.order = feed.order  # Grows while the run goes on
+        self.position = 0
+        self.wheel = TimerWheel()  # Any process may turn out to have I/O
+        self.feed = feed
+        self.now = 0  # Latest time the scheduler advanced to
+
+    def next_time(self):
+        feed = self.feed
+        feed.wait_for_next(self.position, self.now)
+        upcoming = ArrivalCursor.next_time(self)
+        if feed.closed:
+            return upcoming
+        # Nothing can arrive before the known horizon, so it stands in for
+        # an arrival that hasn't been received yet
+        horizon = feed.known_before()
+        return horizon if upcoming is None else min(upcoming, horizon)
+
+    def advance(self, t_now):
+        self.feed.wait_until_known(t_now)
+        self.now = max(self.now, t_now)
+        yield from ArrivalCursor.advance(self, t_now)
+        self.feed.consumed(self.position)
+
+class LiveProcessTable(ProcessTable):
+    def __init__(self, feed):
+        super().__init__()
+        self.feed = feed
+
+    def arrival_cursor(self):
+        return LiveArrivalCursor(self, self.feed)
+
+# Scheduler thread: run the events and hand each one's lines to emit.
+# Without a runfor, the run ends when the scheduler would idle forever.
+def run_events(processes, feed, events, run_for, emit):
+    try:
+        finished_at = run_for
+        for event in events:
+            if feed.cancelled:
+                break
+            if event[1] == IDLE and event[3] == FOREVER:
+                finished_at = event[0]
+                break
+            emit(list(event_lines(processes.names, (event,))))
+        events.close()
+        emit(summary_lines(processes, finished_at))
+    finally:
+        emit(None)  # The session ends even if the scheduler failed
+
+# One run: read process lines with read_line() until the input ends, and
+# send the log with write(text). Both are coroutines.
+async def serve_session(read_line, write, algorithm, params, run_for=None, tick=None):
+    loop = asyncio.get_running_loop()
+    feed = ArrivalFeed(loop, tick)
+    processes = LiveProcessTable(feed)
+    queue = asyncio.Queue(EVENT_BUFFER)
+
+    # The scheduler thread blocks on a full queue, which is the backpressure.
+    # The writer drains the queue until the end even once the consumer is gone.
+    def emit(lines):
+        asyncio.run_coroutine_threadsafe(queue.put(lines), loop).result()
+
+    events = algorithm.events(processes, run_for or FOREVER, **params)
+    await queue.put(algorithm.header(**params))
+    thread = threading.Thread(target=run_events, args=(processes, feed, events, run_for or FOREVER, emit), daemon=True)
+    thread.start()
+
+    async def read_input():
+        while True:
+            await feed.room.wait()
+            line = await read_line()
+            if not line:
+                break
+            parts = line.split()
+            if not parts or parts[0].startswith("#"):
+                continue
+            try:
+                if parts[0] == "process":
+                    feed.add(processes, *parse_process(parts))
+                elif parts[0] == "time" and len(parts) > 1:
+                    feed.advance_to(int(parts[1]))
+                elif parts[0] == "end":
+                    break
+                else:
+                    raise ValueError(f"Unknown line: {line.strip()}")
+            except ValueError as error:
+                print(f"Error: {error}", file=sys.stderr)
+        feed.close()
+
+    async def write_output():
+        while True:
+            lines = await queue.get()
+            if lines is None:
+                return
+            if not feed.cancelled:
+                try:
+                    await write("".join(line + "\n" for line in lines))
+                except (ConnectionError, BrokenPipeError):
+                    feed.cancel()  # Nobody to send the rest to; let the scheduler stop
+
+    reading = asyncio.ensure_future(read_input())
+    await write_output()
+    reading.cancel()
+    feed.close()
+    await loop.run_in_executor(None, thread.join)
+
+# Serve stdin/stdout. Blocking reads and writes run on threads, so this
+# works for pipes, terminals and plain files alike. The reading thread is
+# a daemon that stays a bounded queue ahead, so a run that ends before its
+# input does not wait for another line.
+async def serve_stdio(algorithm, params, run_for, tick):
+    loop = asyncio.get_running_loop()
+    lines = asyncio.Queue(ARRIVAL_BACKLOG)
+
+    def read_stdin():
+        for line in sys.stdin:
+            asyncio.run_coroutine_threadsafe(lines.put(line), loop).result()
+        asyncio.run_coroutine_threadsafe(lines.put(""), loop).result()
+
+    threading.Thread(target=read_stdin, daemon=True).start()
+
+    async def read_line():
+        return await lines.get()
+
+    def write_now(text):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    async def write(text):
+        await loop.run_in_executor(None, write_now, text)
+
+    await serve_session(read_line, write, algorithm, params, run_for, tick)
+
+# Serve every connection to a tcp:HOST:PORT or unix:PATH address
+async def serve_socket(address, algorithm, params, run_for, tick):
+    async def connection(reader, writer):
+        async def read_line():
+            return (await reader.readline()).decode()
+
+        async def write(text):
+            writer.write(text.encode())
+            await writer.drain()  # Waits while the client isn't reading
+
+        try:
+            await serve_session(read_line, write, algorithm, params, run_for, tick)
+        finally:
+            writer.close()
+
+    kind, _, location = address.partition(":")
+    if kind == "tcp":
+        host, _, port = location.rpartition(":")
+        server = await asyncio.start_server(connection, host or None, int(port))
+    elif kind == "unix":
+        server = await asyncio.start_unix_server(connection, location)
+    else:
+        raise ValueError(f"Listen address must be tcp:HOST:PORT or unix:PATH, not {address}.")
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m scheduler.online",
+                                     description="Schedule processes as they arrive on stdin or a socket.")
+    parser.add_argument("algorithm", choices=sorted(name for name, algorithm in ALGORITHMS.items() if algorithm.online))
+    parser.add_argument("--quantum", type=int, help="quantum for rr (and the other algorithms that take one)")
+    parser.add_argument("--runfor", type=int, help="stop at this time instead of when the input and the work run out")
+    parser.add_argument("--tick", type=float, help="run on the wall clock, this many seconds per time unit")
+    parser.add_argument("--listen", help="tcp:HOST:PORT or unix:PATH instead of stdin/stdout")
+    arguments = parser.parse_args(argv)
+
+    algorithm = ALGORITHMS[arguments.algorithm]
+    try:
+        params = algorithm_params(algorithm, {"quantum": arguments.quantum} if algorithm.accepts("quantum") else {})
+        if arguments.tick is not None and arguments.tick <= 0:
+            raise ValueError("Tick must be positive.")
+        if arguments.listen is None:
+            asyncio.run(serve_stdio(algorithm, params, arguments.runfor, arguments.tick))
+        else:
+            asyncio.run(serve_socket(arguments.listen, algorithm, params, arguments.runfor, arguments.tick))
+    except ValueError as error:
+        print(f"Error: {error}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# Packed binary workloads: the parsed contents of a .in file, stored as
+# the process table's own int64 columns so loading one is a few memcpys
+# instead of parsing millions of lines.
+#
+#     python -m scheduler.packed workload.in workload.wl    # pack
+#     python -m scheduler.packed workload.wl workload.in    # and back
+#
+# load_workload() recognises a packed file by its magic number, so
+# anything that takes a .in path takes a packed workload as well.
+#
+# Layout: a 64-byte header, a JSON block with the algorithm and its
+# parameters, then little-endian int64 arrays (arrival, burst, tickets,
+# io_offset, io_phases) and finally the names, newline separated.
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+from .parse import Workload, WorkloadError, load_workload
+from .table import DEFAULT_TICKETS, ProcessTable
+
+WORKLOAD_MAGIC = b"SCHEDWKL"
+WORKLOAD_VERSION = 1
+WORKLOAD_HEADER = struct.Struct("<8sIIqqQQQQ")  # magic, version, cpus, runfor, processcount, count, phases, names size, settings size
+WORKLOAD_HEADER_SIZE = 64
+
+# int64 column as little-endian bytes
+def column_bytes(column):
+    column = array('q', column)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+# int64 column from little-endian bytes
+def column_from(view):
+    column = array('q')
+    column.frombytes(view)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+# Write a Workload (as load_workload returns it) in the packed format
+def write_packed_workload(output_file, workload):
+    processes = workload.processes
+    count = len(processes)
+    phases = processes.io_offset[count] if count else 0
+    settings = json.dumps({"algorithm": workload.algorithm, "params": workload.params}).encode()
+    names = "\n".join(processes.names).encode()
+    with open(output_file, 'wb') as file:
+        header = WORKLOAD_HEADER.pack(WORKLOAD_MAGIC, WORKLOAD_VERSION, workload.cpus, workload.run_for,
+                                      workload.process_count, count, phases, len(names), len(settings))
+        file.write(header.ljust(WORKLOAD_HEADER_SIZE, b"\0"))
+        file.write(settings)
+        for column in (processes.arrival, processes.burst, processes.tickets):
+            file.write(column_bytes(column[:count]))
+        file.write(column_bytes(processes.io_offset[:count + 1]))
+        file.write(column_bytes(processes.io_phases[:phases]))
+        file.write(names)
+
+# Load a packed workload; raises WorkloadError if the file isn't one
+def load_packed_workload(input_file):
+    with open(input_file, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if len(mapped) < WORKLOAD_HEADER_SIZE:
+            raise WorkloadError(f"{input_file} is not a version {WORKLOAD_VERSION} packed workload.")
+        magic, version, cpus, run_for, process_count, count, phases, names_size, settings_size = \
+            WORKLOAD_HEADER.unpack_from(mapped)
+        if magic != WORKLOAD_MAGIC or version != WORKLOAD_VERSION:
+            raise WorkloadError(f"{input_file} is not a version {WORKLOAD_VERSION} packed workload.")
+        view = memoryview(mapped)
+        try:
+            offset = WORKLOAD_HEADER_SIZE
+            settings = json.loads(bytes(view[offset:offset + settings_size]))
+            offset += settings_size
+            columns = []
+            for size in (count, count, count, count + 1, phases):
+                columns.append(column_from(view[offset:offset + 8 * size]))
+                offset += 8 * size
+            names = str(view[offset:offset + names_size], "utf-8").split("\n") if count else []
+        finally:
+            view.release()
+
+    arrival, burst, tickets, io_offset, io_phases = columns
+    # Names stay as split() made them: interning a million of them costs
+    # more than the rest of the load put together
+    processes = ProcessTable.from_columns(names, arrival, burst, tickets, io_offset, io_phases)
+    return Workload(processes, run_for, settings["algorithm"], settings["params"], process_count, cpus)
+
+# Lines of a .in file for a workload (the reverse of the packing)
+def workload_lines(workload):
+    yield f"processcount {workload.process_count}\t# Read {workload.process_count} processes"
+    yield f"runfor {workload.run_for}\t# Run for {workload.run_for} time units"
+    if workload.algorithm is not None:
+        yield f"use {workload.algorithm}"
+    if workload.cpus > 1:
+        yield f"cpus {workload.cpus}"
+    for param, value in workload.params.items():
+        yield f"{param} {' '.join(str(item) for item in value) if isinstance(value, list) else value}"
+    for process in workload.processes:
+        bursts = process.bursts
+        extra = "".join(f" io {bursts[k]} burst {bursts[k + 1]}" for k in range(1, len(bursts), 2))
+        if process.tickets != DEFAULT_TICKETS:
+            extra += f" tickets {process.tickets}"
+        yield f"process name {process.name} arrival {process.arrival} burst {bursts[0]}{extra}"
+    yield "end"
+
+# Convert between .in and packed workloads, whichever way round
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("Usage: python -m scheduler.packed <input .in or packed workload> <output file>")
+        sys.exit(1)
+    input_file, output_file = argv
+    try:
+        with open(input_file, 'rb') as file:
+            packed = file.read(len(WORKLOAD_MAGIC)) == WORKLOAD_MAGIC
+        workload = load_workload(input_file)
+    except (ValueError, OSError) as error:
+        print(f"Error: {error}")
+        sys.exit(1)
+    if packed:
+        with open(output_file, 'w', buffering=1 << 20) as file:
+            file.writelines(line + "\n" for line in workload_lines(workload))
+    else:
+        write_packed_workload(output_file, workload)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# Parallel parameter sweeps over one workload. Imported on demand, so the
+# process pool and shared memory machinery only load when a sweep runs.
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from .metrics import summary_metrics
+from .registry import get_algorithm
+from .runner import run_scheduler
+from .table import ProcessTable
+
+# Parameter sweep. Runs every (algorithm, quantum) combination over one
+# workload across a process pool and returns one metrics row per
+# configuration. Every configuration also gets the workload's other
+# parameters (quanta, boost, seed, ...), with only the quantum swept. The
+# process columns and the names are written once into a shared memory
+# block; each worker attaches to it when it starts and builds its tables
+# directly on top of that memory, so the workload is never re-parsed or
+# pickled per task.
+def sweep(processes, run_for, algorithms, quanta=(), max_workers=None, cpus=1, params=None):
+    configs = []
+    for algorithm in algorithms:
+        for quantum in (quanta if get_algorithm(algorithm).accepts("quantum") else [None]):
+            configs.append((algorithm, quantum))
+
+    # Block layout: arrival, burst and tickets columns, the I/O offsets and
+    # phases, then the newline-joined names
+    count = len(processes)
+    phases = len(processes.io_phases)
+    names = "\n".join(processes.names).encode()
+    names_start = 32 * count + 8 + 8 * phases
+    block = shared_memory.SharedMemory(create=True, size=max(names_start + len(names), 1))
+    try:
+        block.buf[:8 * count] = processes.arrival.tobytes()
+        block.buf[8 * count:16 * count] = processes.burst.tobytes()
+        block.buf[16 * count:24 * count] = processes.tickets.tobytes()
+        block.buf[24 * count:32 * count + 8] = processes.io_offset.tobytes()
+        block.buf[32 * count + 8:names_start] = processes.io_phases.tobytes()
+        block.buf[names_start:names_start + len(names)] = names
+
+        with ProcessPoolExecutor(max_workers, initializer=attach_sweep_workload,
+                                 initargs=(block.name, count, phases, len(names))) as pool:
+            count = len(configs)
+            results = pool.map(run_sweep_config, configs, [run_for] * count, [cpus] * count, [params or {}] * count)
+            return [
+                {"algorithm": algorithm, "quantum": quantum, **metrics}
+                for (algorithm, quantum), metrics in zip(configs, results)
+            ]
+    finally:
+        block.close()
+        block.unlink()
+
+# Per-worker view of the shared sweep workload, set by attach_sweep_workload
+sweep_workload = None
+
+# Pool initializer: attach to the shared block once per worker process
+def attach_sweep_workload(block_name, count, phases, names_size):
+    global sweep_workload
+    block = shared_memory.SharedMemory(name=block_name)
+    arrival = block.buf[:8 * count].cast('q')
+    burst = block.buf[8 * count:16 * count].cast('q')
+    tickets = block.buf[16 * count:24 * count].cast('q')
+    io_offset = block.buf[24 * count:32 * count + 8].cast('q')
+    io_phases = block.buf[32 * count + 8:32 * count + 8 + 8 * phases].cast('q')
+    names_start = 32 * count + 8 + 8 * phases
+    names = bytes(block.buf[names_start:names_start + names_size]).decode().split("\n") if count else []
+    sweep_workload = (block, names, arrival, burst, tickets, io_offset, io_phases)
+
+# Run one sweep configuration against the attached workload
+def run_sweep_config(config, run_for, cpus=1, params=None):
+    algorithm, quantum = config
+    params = {**(params or {}), "quantum": quantum}
+    _, names, arrival, burst, tickets, io_offset, io_phases = sweep_workload
+    processes = ProcessTable.from_columns(names, arrival, burst, tickets, io_offset, io_phases)
+    run_scheduler(processes, run_for, algorithm, trace=False, cpus=cpus, **params)
+    return summary_metrics(processes, run_for)
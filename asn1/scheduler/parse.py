@@ -0,0 +1,175 @@
+# Parsing of .in workload files
+
+import mmap
+import os
+import sys
+from array import array
+
+from .registry import ALGORITHMS, algorithm_params
+from .table import DEFAULT_TICKETS, ProcessTable
+
+# How each algorithm parameter line is read. Values stop at a "#" comment.
+PARAM_PARSERS = {
+    "quantum": lambda values: int(values[0]),
+    "levels": lambda values: int(values[0]),
+    "quanta": lambda values: [int(value) for value in values],
+    "boost": lambda values: int(values[0]),
+    "seed": lambda values: int(values[0]),
+}
+
+# A malformed or inconsistent workload file. A ValueError, so callers that
+# already handle the registry's errors handle these too.
+class WorkloadError(ValueError):
+    pass
+
+# A parsed .in file: the process table plus the run settings around it
+class Workload:
+    def __init__(self, processes, run_for, algorithm=None, params=None, process_count=0, cpus=1):
+        self.processes = processes  # ProcessTable with one row per "process" line
+        self.run_for = run_for  # Total runtime for the scheduler
+        self.algorithm = algorithm  # Algorithm named on the "use" line
+        self.params = params or {}  # Algorithm parameters (quantum, ...)
+        self.process_count = process_count  # Number from the "processcount" line
+        self.cpus = cpus  # Number of CPUs from the "cpus" line (1 if absent)
+
+# Parse the input file for processes, algorithm type, and quantum (if RR).
+# The file is memory-mapped and read one line of bytes at a time, so even
+# a huge workload is never held in memory as text; process rows go
+# straight into typed columns, and the table is built from them at the
+# end. Packed binary workloads (see packed.py) are recognised by their
+# magic number and loaded without parsing. Raises WorkloadError on a bad
+# workload.
+def load_workload(input_file):
+    from .packed import WORKLOAD_MAGIC, load_packed_workload  # packed.py imports this module
+
+    with open(input_file, 'rb') as file:
+        if file.read(len(WORKLOAD_MAGIC)) == WORKLOAD_MAGIC:
+            return load_packed_workload(input_file)
+        if os.fstat(file.fileno()).st_size == 0:
+            return Workload(ProcessTable(), 0)
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return parse_workload_lines(iter(mapped.readline, b""))
+
+def parse_workload_lines(lines):
+    process_count = 0  # Number of processes
+    run_for = 0  # Total runtime for the scheduler
+    algorithm = None  # Selected algorithm (any registered name)
+    params = {}  # Algorithm parameters
+    cpus = 1  # Number of simulated CPUs
+
+    # Process table columns, filled in row by row
+    names = []
+    arrival, burst, tickets = array('q'), array('q'), array('q')
+    io_offset, io_phases = array('q', [0]), array('q')
+
+    for line in lines:
+        parts = line.split()
+        if not parts:
+            continue  # Blank line
+        keyword = parts[0]
+
+        if keyword == b"process":
+            if len(parts) == 7 or (len(parts) > 7 and parts[7].startswith(b"#")):
+                # Plain "process name P arrival A burst B": no decoding beyond the name
+                names.append(sys.intern(parts[2].decode()))
+                arrival.append(int(parts[4]))
+                burst.append(int(parts[6]))
+                tickets.append(DEFAULT_TICKETS)
+                io_offset.append(len(io_phases))
+                continue
+            # Everything else (I/O bursts, tickets, malformed lines)
+            name, process_arrival, bursts, process_tickets = parse_process(line.decode().split())
+            names.append(sys.intern(name))
+            arrival.append(process_arrival)
+            burst.append(sum(bursts[::2]))
+            tickets.append(process_tickets)
+            io_phases.extend(bursts[1:])
+            io_offset.append(len(io_phases))
+            continue
+
+        keyword = keyword.decode()
+        parts = line.decode().split()
+        if keyword == "processcount":
+            process_count = int(parts[1])  # Read number of processes
+        elif keyword == "runfor":
+            run_for = int(parts[1])  # Read total runtime
+        elif keyword == "cpus":
+            cpus = int(parts[1])  # Read number of CPUs
+            if cpus <= 0:
+                raise WorkloadError("Number of CPUs must be positive.")
+        elif keyword == "use":
+            algorithm = parts[1]  # Determine which algorithm to use
+            if algorithm not in ALGORITHMS:
+                raise WorkloadError(f"Unsupported algorithm {algorithm}.")
+        elif keyword == "quantum":
+            # Only algorithms that take a quantum (round robin) may have one
+            if algorithm is not None and ALGORITHMS[algorithm].accepts("quantum"):
+                params["quantum"] = int(parts[1])
+            else:
+                raise WorkloadError("Quantum provided but algorithm is not round robin (rr).")
+        elif keyword in PARAM_PARSERS:
+            # Other algorithm parameters, only for algorithms that declare them
+            if algorithm is None or not ALGORITHMS[algorithm].accepts(keyword):
+                raise WorkloadError(f"{keyword} provided but algorithm {algorithm} does not use it.")
+            values = []
+            for part in parts[1:]:
+                if part.startswith("#"):
+                    break
+                values.append(part)
+            params[keyword] = PARAM_PARSERS[keyword](values)
+        elif keyword == "end":
+            break
+
+    processes = ProcessTable.from_columns(names, arrival, burst, tickets, io_offset, io_phases)
+    check_settings(algorithm, params, cpus)
+    return Workload(processes, run_for, algorithm, params, process_count, cpus)
+
+# Ensure every parameter the algorithm needs was provided, and is valid
+def check_settings(algorithm, params, cpus):
+    if algorithm is None:
+        return
+    if cpus > 1 and ALGORITHMS[algorithm].smp is None:
+        raise WorkloadError(f"Algorithm {algorithm} does not support multiple CPUs.")
+    for param in ALGORITHMS[algorithm].params:
+        if param not in params:
+            raise WorkloadError(f"Missing {param} parameter when using {algorithm}.")
+    try:
+        algorithm_params(ALGORITHMS[algorithm], params)
+    except ValueError as error:
+        raise WorkloadError(str(error)) from error
+
+# Fields of a "process" line, split into words: (name, arrival, bursts,
+# tickets). After the first burst come optional "io N burst M" pairs and
+# "tickets N". Raises WorkloadError on a malformed line.
+def parse_process(parts):
+    if len(parts) < 7:
+        raise WorkloadError("Process lines look like: process name P arrival A burst B [io N burst M]... [tickets T]")
+    name = parts[2]
+    arrival = int(parts[4])
+    bursts = [int(parts[6])]
+    tickets = DEFAULT_TICKETS
+    for position in range(7, len(parts), 2):
+        keyword = parts[position]
+        if keyword.startswith("#"):
+            break
+        if position + 1 == len(parts):
+            raise WorkloadError(f"Process {name} has {keyword} without a value.")
+        value = parts[position + 1]
+        if keyword == "tickets":
+            tickets = int(value)
+            if tickets <= 0:
+                raise WorkloadError(f"Process {name} must have a positive number of tickets.")
+        elif keyword == "io" and len(bursts) % 2 == 1 and int(value) > 0:
+            bursts.append(int(value))
+        elif keyword == "burst" and len(bursts) % 2 == 0:
+            bursts.append(int(value))
+        else:
+            raise WorkloadError(f"Process {name} must alternate burst and io with positive I/O times.")
+    if len(bursts) % 2 == 0:
+        raise WorkloadError(f"Process {name} must end with a CPU burst.")
+    return name, arrival, bursts, tickets
+
+# Older interface: (process_count, run_for, processes, algorithm, quantum)
+def parse_input_file(input_file):
+    workload = load_workload(input_file)
+    return workload.process_count, workload.run_for, workload.processes, workload.algorithm, workload.params.get("quantum")
@@ -0,0 +1,197 @@
+# Profiling mode (--profile): where a run's time goes.
+#
+# The run is split into phases timed with perf_counter_ns: parse the .in,
+# simulate (drain the scheduler's events into a list), format (render the
+# events into .out lines) and write. Normal runs stream all of these
+# through each other, so the split costs some memory, but it is the only
+# way to tell the phases apart.
+#
+# Counters come from two places:
+#   - the event stream: events per kind and the log lines rendered
+#   - the profiled run's table, a CountingProcessTable. Its arrival cursor
+#     counts arrival scans, next-arrival checks and completions per call,
+#     and the schedulers build their ready queues from the classes and
+#     heap functions it hands out (ProcessTable.queue_class and
+#     heap_operations), which it swaps for counting ones: every push, pop,
+#     steal, MLFQ boost splice and lottery ticket update or draw is counted
+#     where the scheduler makes it. Only that run's table is affected; an
+#     ordinary table hands out the plain classes and heapq's functions, so
+#     a normal run (or one on another thread) pays nothing for any of this.
+#
+# With a cProfile file, the simulate and format phases also run under
+# cProfile; the stats are dumped there and the top functions go into the
+# report. The report is JSON.
+
+import heapq
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from .log import ARRIVED, BLOCKED, BOOST, FINISHED, IDLE, KIND_MASK, SELECTED, STOLEN, WOKEN, render_log
+from .table import ArrivalCursor, ProcessTable
+
+KIND_NAMES = {
+    ARRIVED: "arrived", SELECTED: "selected", FINISHED: "finished", IDLE: "idle",
+    BOOST: "boost", STOLEN: "stolen", BLOCKED: "blocked", WOKEN: "woken",
+}
+
+TOP_FUNCTIONS = 20  # Functions listed in the report from a cProfile run
+
+# Counter for each ready queue method a counting queue class counts
+QUEUE_OPERATIONS = {
+    "append": "queue_pushes", "push": "queue_pushes",  # deque, LevelQueue / SMP run queues
+    "popleft": "queue_pops", "take": "queue_pops",
+    "steal": "queue_steals",  # Work stealing between cores
+    "splice": "queue_splices",  # MLFQ priority boost
+    "add": "queue_updates", "find": "queue_draws",  # Lottery ticket pool
+}
+
+class Profile:
+    def __init__(self):
+        self.phases = {}  # Phase name -> nanoseconds
+        self.counters = Counter()
+
+    # Time the body of a with block as the named phase
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + time.perf_counter_ns() - started
+
+    # Count events by kind as they stream past
+    def count_events(self, events):
+        counters = Counter()
+        for event in events:
+            counters[event[1] & KIND_MASK] += 1
+            yield event
+        self.counters["events"] += sum(counters.values())
+        for kind, count in counters.items():
+            self.counters[f"events_{KIND_NAMES.get(kind, kind)}"] += count
+
+    # Count the lines of a rendered log as they stream past
+    def count_lines(self, lines):
+        count = 0
+        for line in lines:
+            count += 1
+            yield line
+        self.counters["log_lines"] += count
+
+    # Copy of a table whose arrival cursors count into this profile
+    def counting_table(self, table):
+        counted = CountingProcessTable.from_columns(table.names, table.arrival, table.burst, table.tickets,
+                                                    table.io_offset, table.io_phases)
+        counted.counters = self.counters
+        return counted
+
+    def report(self, **details):
+        report = dict(details)
+        report["phases_ns"] = dict(self.phases)
+        report["total_ns"] = sum(self.phases.values())
+        report["counters"] = dict(sorted(self.counters.items()))
+        return report
+
+# Arrival cursor that counts its calls into a profile's counters
+class CountingArrivalCursor(ArrivalCursor):
+    def __init__(self, table, counters):
+        super().__init__(table)
+        self.counters = counters
+
+    def next_time(self):
+        self.counters["next_arrival_checks"] += 1
+        return super().next_time()
+
+    def advance(self, t_now):
+        self.counters["arrival_scans"] += 1
+        return super().advance(t_now)
+
+    def complete(self, index, t):
+        self.counters["completions"] += 1
+        return super().complete(index, t)
+
+class CountingProcessTable(ProcessTable):
+    counters = None  # Counter the cursors and queues count into, set by Profile.counting_table
+
+    def arrival_cursor(self):
+        return CountingArrivalCursor(self, self.counters)
+
+    def queue_class(self, cls):
+        return counting_queue_class(cls, self.counters)
+
+    def heap_operations(self):
+        counters = self.counters
+
+        def heappush(heap, item):
+            counters["queue_pushes"] += 1
+            heapq.heappush(heap, item)
+
+        def heappop(heap):
+            counters["queue_pops"] += 1
+            return heapq.heappop(heap)
+
+        return heappush, heappop
+
+# Subclass of a ready queue class whose QUEUE_OPERATIONS methods count
+# their calls into counters
+def counting_queue_class(cls, counters):
+    def counted(method, counter):
+        def call(self, *args):
+            counters[counter] += 1
+            return method(self, *args)
+        return call
+
+    methods = {name: counted(getattr(cls, name), counter)
+               for name, counter in QUEUE_OPERATIONS.items() if hasattr(cls, name)}
+    return type(f"Counting{cls.__name__}", (cls,), methods)
+
+# Run one workload phase by phase and return the report. run is called
+# with the parsed workload and returns (header, events); write is called
+# with the rendered lines.
+def profile_run(input_file, load, run, write, cprofile_file=None):
+    profile = Profile()
+    with profile.phase("parse"):
+        workload = load(input_file)
+    workload.processes = profile.counting_table(workload.processes)
+
+    profiler = None
+    if cprofile_file is not None:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        with profile.phase("simulate"):
+            header, events = run(workload)
+            events = list(profile.count_events(events))
+        with profile.phase("format"):
+            lines = list(profile.count_lines(render_log(workload.processes, workload.run_for, header, events)))
+    finally:
+        if profiler is not None:
+            profiler.disable()
+    with profile.phase("write"):
+        write(lines)
+
+    report = profile.report(input=input_file, algorithm=workload.algorithm, params=workload.params,
+                            processes=len(workload.processes), run_for=workload.run_for, cpus=workload.cpus)
+    if profiler is not None:
+        profiler.dump_stats(cprofile_file)
+        report["cprofile_file"] = cprofile_file
+        report["cprofile_top"] = top_functions(profiler)
+    return report
+
+# The functions with the most cumulative time in a cProfile run
+def top_functions(profiler):
+    import pstats
+    stats = pstats.Stats(profiler).stats
+    rows = []
+    for (filename, line, function), (_, calls, own, cumulative, _) in stats.items():
+        rows.append({"function": f"{filename}:{line}({function})", "calls": calls,
+                     "own_ns": int(own * 1e9), "cumulative_ns": int(cumulative * 1e9)})
+    rows.sort(key=lambda row: row["cumulative_ns"], reverse=True)
+    return rows[:TOP_FUNCTIONS]
+
+def write_report(report_file, report):
+    with open(report_file, 'w') as file:
+        json.dump(report, file, indent=2)
+        file.write("\n")
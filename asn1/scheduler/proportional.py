@@ -0,0 +1,162 @@
+# Proportional-share schedulers: stride and lottery scheduling.
+#
+# Each process holds some tickets (100 unless its "process" line says
+# otherwise) and gets CPU time in proportion to them. Both run one
+# quantum at a time like Round-Robin and log a selection for every slice.
+#   - stride: each process has a pass value that grows by STRIDE1 / tickets
+#     every time it runs; the ready process with the lowest pass runs next.
+#     The ready set is a min-heap on (pass, index).
+#   - lottery: every slice draws a ticket uniformly from the ready
+#     processes' tickets. Ticket counts sit in a Fenwick tree indexed by
+#     process, so a draw and an arrival/exit are O(log n) each.
+#     Draws come from a seeded RNG so the output is reproducible.
+
+import random
+from array import array
+
+from .log import IDLE, SELECTED
+from .registry import register_algorithm
+from .table import NOT_STARTED
+
+# Pass increment for a process with one ticket. Large so that integer
+# strides stay close to proportional for any realistic ticket count.
+STRIDE1 = 1 << 20
+
+# Prefix sums over per-process ticket counts (a binary indexed tree)
+class FenwickTree:
+    def __init__(self, size):
+        self.size = size
+        self.tree = array('q', bytes(8 * (size + 1)))  # 1-based partial sums
+        self.total = 0  # Sum of every count in the tree
+        self.top = 1 << size.bit_length() if size else 0  # Highest power of two to start find() from
+
+    # Add delta to the count of the given (0-based) index
+    def add(self, index, delta):
+        self.total += delta
+        tree, size = self.tree, self.size
+        index += 1
+        while index <= size:
+            tree[index] += delta
+            index += index & -index
+
+    # Index whose range of cumulative counts contains ticket, for
+    # 0 <= ticket < total; walks down the tree instead of scanning
+    def find(self, ticket):
+        tree, size = self.tree, self.size
+        position = 0
+        step = self.top
+        while step:
+            following = position + step
+            if following <= size and tree[following] <= ticket:
+                position = following
+                ticket -= tree[following]
+            step >>= 1
+        return position  # position is 1-based, so this is the 0-based index
+
+def quantum_validate(quantum, **params):
+    if quantum <= 0:
+        raise ValueError("Quantum must be positive.")
+
+# Stride scheduler
+@register_algorithm("stride", lambda quantum: ["Using Stride Scheduling", f"Quantum   {quantum}", ""],
+                    defaults={"quantum": 1}, validate=quantum_validate, online=True)
+def stride_events(processes, run_for, quantum=1):
+    arrival, tickets = processes.arrival, processes.tickets  # Column aliases
+    remaining, start, response = processes.remaining, processes.start, processes.response
+    current_time = 0  # Current time in the scheduler
+    global_pass = 0  # Pass of the most recently selected process
+    ready_queue = []  # Heap of (pass, index) entries
+    heappush, heappop = processes.heap_operations()
+    arrivals = processes.arrival_cursor()  # Processes in arrival order
+
+    while current_time < run_for:
+        # New arrivals start at the current global pass, so they don't get
+        # to catch up on the time before they arrived
+        for event in arrivals.advance(current_time):
+            yield event
+            index = event[2]
+            heappush(ready_queue, (global_pass, index))
+
+        if not ready_queue:
+            # If no process is ready, stay idle until the next arrival (or the end)
+            idle_until = run_for
+            if arrivals.next_time() is not None:
+                idle_until = min(arrivals.next_time(), run_for)
+            yield (current_time, IDLE, -1, idle_until)
+            current_time = idle_until
+            continue
+
+        # Select the process with the lowest pass
+        global_pass, current = heappop(ready_queue)
+        if start[current] == NOT_STARTED:
+            start[current] = current_time
+            response[current] = current_time - arrival[current]
+        yield (current_time, SELECTED, current, remaining[current])
+
+        # Run the process for one quantum or its remaining burst, in one step
+        time_to_run = min(quantum, remaining[current], run_for - current_time)
+        remaining[current] -= time_to_run
+        current_time += time_to_run
+
+        # Arrivals during the slice are logged at their own times
+        for event in arrivals.advance(min(current_time, run_for - 1)):
+            yield event
+            index = event[2]
+            heappush(ready_queue, (global_pass, index))
+
+        if remaining[current] == 0:
+            # If the CPU burst is done, the process finishes or blocks for I/O
+            yield arrivals.complete(current, current_time)
+        else:
+            # Otherwise charge it one stride and put it back
+            heappush(ready_queue, (global_pass + STRIDE1 // tickets[current], current))
+
+# Lottery scheduler
+@register_algorithm("lottery", lambda quantum, seed: ["Using Lottery Scheduling", f"Quantum   {quantum}", f"Seed   {seed}", ""],
+                    defaults={"quantum": 1, "seed": 0}, validate=quantum_validate)
+def lottery_events(processes, run_for, quantum=1, seed=0):
+    arrival, tickets = processes.arrival, processes.tickets  # Column aliases
+    remaining, start, response = processes.remaining, processes.start, processes.response
+    current_time = 0  # Current time in the scheduler
+    pool = processes.queue_class(FenwickTree)(len(processes))  # Tickets held by ready processes
+    draw = random.Random(seed).randrange  # Seeded, so the same input gives the same draws
+    arrivals = processes.arrival_cursor()  # Processes in arrival order
+
+    while current_time < run_for:
+        # Add any new arrivals' tickets to the pool
+        for event in arrivals.advance(current_time):
+            yield event
+            index = event[2]
+            pool.add(index, tickets[index])
+
+        if not pool.total:
+            # If no process is ready, stay idle until the next arrival (or the end)
+            idle_until = run_for
+            if arrivals.next_time() is not None:
+                idle_until = min(arrivals.next_time(), run_for)
+            yield (current_time, IDLE, -1, idle_until)
+            current_time = idle_until
+            continue
+
+        # Draw the winning ticket; the winner stays in the pool until its burst ends
+        current = pool.find(draw(pool.total))
+        if start[current] == NOT_STARTED:
+            start[current] = current_time
+            response[current] = current_time - arrival[current]
+        yield (current_time, SELECTED, current, remaining[current])
+
+        # Run the process for one quantum or its remaining burst, in one step
+        time_to_run = min(quantum, remaining[current], run_for - current_time)
+        remaining[current] -= time_to_run
+        current_time += time_to_run
+
+        # Arrivals during the slice are logged at their own times
+        for event in arrivals.advance(min(current_time, run_for - 1)):
+            yield event
+            index = event[2]
+            pool.add(index, tickets[index])
+
+        if remaining[current] == 0:
+            # If the CPU burst is done, take its tickets out until it is ready again
+            pool.add(current, -tickets[current])
+            yield arrivals.complete(current, current_time)
@@ -0,0 +1,49 @@
+# Algorithm registry. Each scheduling algorithm registers its event
+# generator under the name used on the "use" line of a .in file, along
+# with its header lines and the parameters it reads from the file.
+
+ALGORITHMS = {}
+
+class Algorithm:
+    def __init__(self, name, events, header, params=(), defaults=None, validate=None, fast_path=None, smp=None, resumable=False, online=False):
+        self.name = name  # Name on the "use" line
+        self.events = events  # events(processes, run_for, **params) -> event generator
+        self.header = header  # header(**params) -> lines printed after the process count
+        self.params = tuple(params)  # Parameters the algorithm requires
+        self.defaults = dict(defaults or {})  # Optional parameters and their default values
+        self.validate = validate  # Optional validate(**params) that raises ValueError
+        self.fast_path = fast_path  # Optional fast_path(processes, run_for, **params) for runs without a trace
+        self.smp = smp  # Optional smp(processes, run_for, cpus, **params) event generator for several CPUs
+        self.resumable = resumable  # Whether events() takes a checkpoint to save to or resume from
+        self.online = online  # Whether events() copes with a table that grows during the run (see online.py)
+
+    # Every parameter name the algorithm accepts
+    def accepts(self, param):
+        return param in self.params or param in self.defaults
+
+# Decorator that registers an event generator as an algorithm
+def register_algorithm(name, header, params=(), defaults=None, validate=None, fast_path=None, smp=None, resumable=False,
+                       online=False):
+    def register(events):
+        ALGORITHMS[name] = Algorithm(name, events, header, params, defaults, validate, fast_path, smp, resumable, online)
+        return events
+    return register
+
+# Look up a registered algorithm; raises ValueError for unknown names
+def get_algorithm(name):
+    if name not in ALGORITHMS:
+        raise ValueError(f"Unsupported algorithm {name}.")
+    return ALGORITHMS[name]
+
+# Keep only the parameters an algorithm uses, make sure none are missing,
+# and fill in defaults for the optional ones
+def algorithm_params(algorithm, params):
+    for param in algorithm.params:
+        if params.get(param) is None:
+            raise ValueError(f"Missing {param} parameter for {algorithm.name}.")
+    selected = {param: params[param] for param in algorithm.params}
+    for param, default in algorithm.defaults.items():
+        selected[param] = params[param] if params.get(param) is not None else default
+    if algorithm.validate is not None:
+        algorithm.validate(**selected)
+    return selected
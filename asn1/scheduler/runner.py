@@ -0,0 +1,95 @@
+# Running a registered algorithm over a workload
+
+from collections import deque
+
+from .log import render_log, summary_lines
+from .metrics import summary_metrics
+from .parse import Workload, load_workload
+from .registry import algorithm_params, get_algorithm
+from .table import ProcessTable
+
+# Header lines and event stream for one algorithm, on one CPU or several.
+# With a checkpoint (see checkpoint.py) the run saves its state to it, or
+# resumes from it if it was read back from a file.
+def scheduler_events(processes, run_for, algorithm, cpus=1, checkpoint=None, **params):
+    algorithm = get_algorithm(algorithm)
+    params = algorithm_params(algorithm, params)
+    if checkpoint is not None:
+        if not algorithm.resumable or cpus != 1:
+            raise ValueError(f"Algorithm {algorithm.name} cannot be checkpointed{' on several CPUs' if cpus != 1 else ''}.")
+        if checkpoint.resuming:
+            checkpoint.check(processes, run_for, algorithm.name, params)
+            checkpoint.resuming = checkpoint.saved  # Nothing to restore after a runfor 0 run
+        else:
+            checkpoint.algorithm, checkpoint.params = algorithm.name, params
+        checkpoint.run_for, checkpoint.count = run_for, len(processes)
+        header = algorithm.header(**params)
+        checkpoint.lines = checkpoint.log_lines if checkpoint.resuming else 1 + len(header)
+        return header, checkpoint.count_lines(algorithm.events(processes, run_for, checkpoint=checkpoint, **params))
+    if cpus == 1:
+        return algorithm.header(**params), algorithm.events(processes, run_for, **params)
+    if cpus < 1:
+        raise ValueError("Number of CPUs must be positive.")
+    if algorithm.smp is None:
+        raise ValueError(f"Algorithm {algorithm.name} does not support multiple CPUs.")
+    header = algorithm.header(**params)
+    return header[:1] + [f"CPUs   {cpus}"] + header[1:], algorithm.smp(processes, run_for, cpus, **params)
+
+# Run one algorithm over a process table and return its output log as a
+# lazy stream of lines. Without a trace the events are run through without
+# being formatted (or skipped entirely if the algorithm has a fast path),
+# and only the header and summary are returned.
+def run_scheduler(processes, run_for, algorithm, trace=True, cpus=1, checkpoint=None, **params):
+    entry = get_algorithm(algorithm)
+    if not trace and cpus == 1 and checkpoint is None and entry.fast_path is not None and not processes.has_io():
+        params = algorithm_params(entry, params)
+        entry.fast_path(processes, run_for, **params)
+        return [f"  {len(processes)} processes"] + entry.header(**params) + summary_lines(processes, run_for)
+    header, events = scheduler_events(processes, run_for, algorithm, cpus, checkpoint, **params)
+    if not trace:
+        deque(events, maxlen=0)  # Drain the simulation
+        return [f"  {len(processes)} processes"] + header + summary_lines(processes, run_for)
+    return render_log(processes, run_for, header, events)
+
+# Outcome of simulate(): the table the run filled in, and its log lines
+class SimulationResult:
+    def __init__(self, processes, run_for, log):
+        self.processes = processes  # ProcessTable with wait/turnaround/response filled in
+        self.run_for = run_for  # Total runtime of the run
+        self.log = log  # Output lines (header and summary only without a trace)
+
+    # Summary numbers for the run (see summary_metrics)
+    @property
+    def metrics(self):
+        return summary_metrics(self.processes, self.run_for)
+
+# Simulate a workload (a Workload or the path of a .in file). The algorithm
+# and its parameters (and the CPU count) default to the ones in the
+# workload; keyword arguments override them. The workload itself is left untouched, so it can be
+# simulated again with other settings.
+def simulate(workload, algorithm=None, trace=True, run_for=None, cpus=None, **params):
+    if not isinstance(workload, Workload):
+        workload = load_workload(workload)
+    if algorithm is None or algorithm == workload.algorithm:
+        algorithm = workload.algorithm
+        params = {**workload.params, **params}
+    if run_for is None:
+        run_for = workload.run_for
+    if cpus is None:
+        cpus = workload.cpus
+
+    source = workload.processes
+    processes = ProcessTable.from_columns(source.names, source.arrival, source.burst, source.tickets,
+                                         source.io_offset, source.io_phases)
+    log = list(run_scheduler(processes, run_for, algorithm, trace=trace, cpus=cpus, **params))
+    return SimulationResult(processes, run_for, log)
+
+# Older per-algorithm entry points, returning the whole log as a list
+def fifo_scheduler(processes, run_for, trace=True):
+    return list(run_scheduler(processes, run_for, "fcfs", trace=trace))
+
+def sjf_scheduler(processes, run_for):
+    return list(run_scheduler(processes, run_for, "sjf"))
+
+def rr_scheduler(processes, run_for, quantum):
+    return list(run_scheduler(processes, run_for, "rr", quantum=quantum))
@@ -0,0 +1,231 @@
+# Multi-CPU (SMP) simulation for FCFS, preemptive SJF and Round-Robin.
+#
+# Every core has its own run queue. New arrivals go to the lowest idle
+# core, or round robin over the cores when none is idle. With preemptive
+# SJF, an arrival that no core is idle for goes instead to the core whose
+# running process has the most work left, if it is shorter than that
+# process, so it preempts the longest job rather than whichever core is
+# next. A core that runs out of work steals from the next core
+# (cyclically) whose queue is non-empty, taking the entry at the back of
+# that queue.
+#
+# Time always advances by popping a global event heap of slice ends (one
+# live entry per busy core) and the next arrival or I/O wakeup, so the cost per event is
+# O(log cores), never a scan over all cores. Idle and loaded cores are
+# bitmaps, so "lowest idle core" and "next loaded core" are bit tricks.
+# Running processes all count down together, so the one with the most work
+# left is the one whose slice ends last: a max-heap on slice end time
+# (pruned lazily, like the event heap) finds it.
+# Events at the same time are handled like on one CPU: arrivals first,
+# then slice ends (finished), then every core that needs a new process
+# picks one, from its own queue first and by stealing after that.
+
+import heapq
+from collections import deque
+
+from .log import IDLE, SELECTED, STOLEN, on_core
+from .table import NOT_STARTED
+
+# Run queue in arrival order (FCFS and Round-Robin)
+class FifoRunQueue:
+    def __init__(self, processes):
+        self.entries = deque()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def push(self, index):
+        self.entries.append(index)
+
+    # Next process for the owning core
+    def take(self):
+        return self.entries.popleft()
+
+    # Process handed to a thief: the newest one, at the other end
+    def steal(self):
+        return self.entries.pop()
+
+# Run queue on (remaining, arrival, index), like the one-CPU SJF heap
+class ShortestRunQueue:
+    def __init__(self, processes):
+        self.remaining, self.arrival = processes.remaining, processes.arrival
+        self.entries = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def push(self, index):
+        heapq.heappush(self.entries, (self.remaining[index], self.arrival[index], index))
+
+    def take(self):
+        return heapq.heappop(self.entries)[2]
+
+    # The last leaf can be removed without breaking the heap
+    def steal(self):
+        return self.entries.pop()[2]
+
+    # Key of the shortest queued process
+    def first_key(self):
+        return self.entries[0]
+
+# Lowest set bit of a non-zero bitmap, as a core number
+def lowest_bit(bits):
+    return (bits & -bits).bit_length() - 1
+
+# Event generator for N cores. Slices last at most quantum (None means run
+# to completion); with preemptive set, a shorter arrival preempts the
+# process running on the core it is placed on.
+def smp_events(processes, run_for, cpus, queue_class, quantum=None, preemptive=False):
+    arrival = processes.arrival  # Column aliases
+    remaining, start, response = processes.remaining, processes.start, processes.response
+    queue_class = processes.queue_class(queue_class)
+    queues = [queue_class(processes) for _ in range(cpus)]  # Per-core run queues
+    running = [-1] * cpus  # Process on each core, -1 when it has none
+    slice_start = [0] * cpus  # When the running process got the core
+    generation = [0] * cpus  # Bumped on preemption to invalidate the core's heap entry
+    idle = (1 << cpus) - 1  # Bit c is set while core c has nothing to run
+    loaded = 0  # Bit c is set while core c's run queue is non-empty
+    dispatch = idle  # Cores that need a new process at the current time
+    next_core = 0  # Round-robin placement pointer for when no core is idle
+    longest = []  # Preemptive only: max-heap of (-end, -arrival, -index, core) of the running slices
+    arrivals = processes.arrival_cursor()  # Processes in arrival order
+    if run_for <= 0:
+        return
+
+    # Whether an entry of longest is the slice its core is running. A
+    # process's remaining time is only updated when its slice ends, so the
+    # live slice is the one ending at slice start plus remaining.
+    def running_slice(entry):
+        end, _, index, core = entry
+        return running[core] == -index and slice_start[core] + remaining[-index] == -end
+
+    # Global event heap of (time, core, generation); core -1 stands for the
+    # arrivals, and the entry at time 0 starts every core off
+    heap = [(0, -1, 0)]
+    arrival_due = 0  # Time of the arrival entry in the heap, None if there is none
+
+    while heap and heap[0][0] <= run_for:
+        current_time = heap[0][0]
+
+        # Log arrivals; they are placed after the slices ending now are done
+        arrived = []
+        if heap[0][1] == -1:
+            while heap and heap[0][:2] == (current_time, -1):
+                heapq.heappop(heap)
+            for event in arrivals.advance(current_time):
+                yield event
+                arrived.append(event[2])
+            arrival_due = None
+
+        # Slices ending now: finish the process, or put it back on its core
+        # once the arrivals have been queued (as on one CPU, arrivals go first)
+        preempted = []
+        while heap and heap[0][0] == current_time:
+            _, core, token = heapq.heappop(heap)
+            if token != generation[core]:
+                continue  # Preempted since this entry was pushed
+            current = running[core]
+            remaining[current] -= current_time - slice_start[core]
+            running[core] = -1
+            if remaining[current] == 0:
+                # Finished, or blocked on I/O (a wakeup is placed like an arrival)
+                _, kind, _, value = arrivals.complete(current, current_time)
+                yield (current_time, on_core(kind, core), current, value)
+                if not queues[core]:
+                    idle |= 1 << core  # Free for an arrival placed below
+            elif current_time < run_for:
+                preempted.append((core, current))
+            dispatch |= 1 << core
+
+        if current_time == run_for:
+            break
+
+        # Keep an entry for the next arrival or wakeup; a process blocked
+        # just now may wake before the entry that is already there
+        next_arrival = arrivals.next_time()
+        if next_arrival is not None and next_arrival < run_for and (arrival_due is None or next_arrival < arrival_due):
+            heapq.heappush(heap, (next_arrival, -1, 0))
+            arrival_due = next_arrival
+
+        # Place the arrivals: lowest idle core first, then the core running
+        # the longest job if the arrival is shorter, then round robin
+        for index in arrived:
+            if idle:
+                core = lowest_bit(idle)
+                idle &= ~(1 << core)
+            else:
+                core = -1
+                if preemptive:
+                    while longest and not running_slice(longest[0]):
+                        heapq.heappop(longest)  # Ended or preempted since
+                    if longest:
+                        end, arrived_at, current, longest_core = longest[0]
+                        if (remaining[index], arrival[index], index) < (-end - current_time, -arrived_at, -current):
+                            core = longest_core
+                if core < 0:
+                    core = next_core
+                    next_core = (next_core + 1) % cpus
+            queues[core].push(index)
+            loaded |= 1 << core
+            if running[core] == -1:
+                dispatch |= 1 << core
+            elif preemptive:
+                # Preempt if the new arrival beats the process on this core
+                current = running[core]
+                left = remaining[current] - (current_time - slice_start[core])
+                if queues[core].first_key() < (left, arrival[current], current):
+                    remaining[current] = left
+                    running[core] = -1
+                    generation[core] += 1
+                    queues[core].push(current)
+                    dispatch |= 1 << core
+
+        for core, current in preempted:
+            queues[core].push(current)
+            loaded |= 1 << core
+
+        # Cores pick from their own queue first, so no core steals work that
+        # its owner would run at this same time; the rest steal afterwards
+        picks = []  # (core, process, core it was stolen from or -1)
+        thieves = 0
+        while dispatch:
+            core = lowest_bit(dispatch)
+            dispatch &= dispatch - 1
+            if queues[core]:
+                picks.append((core, queues[core].take(), -1))
+                if not queues[core]:
+                    loaded &= ~(1 << core)
+            else:
+                thieves |= 1 << core
+        while thieves:
+            core = lowest_bit(thieves)
+            thieves &= thieves - 1
+            if not loaded:
+                idle |= 1 << core
+                yield (current_time, on_core(IDLE, core), -1, 0)
+                continue
+            after = loaded >> (core + 1)  # Next loaded core after this one, cyclically
+            victim = core + 1 + lowest_bit(after) if after else lowest_bit(loaded)
+            picks.append((core, queues[victim].steal(), victim))
+            if not queues[victim]:
+                loaded &= ~(1 << victim)
+
+        # Start a slice on every core that got a process
+        for core, current, victim in picks:
+            idle &= ~(1 << core)
+            if victim >= 0:
+                yield (current_time, on_core(STOLEN, core), current, victim)
+            if start[current] == NOT_STARTED:
+                start[current] = current_time
+                response[current] = current_time - arrival[current]
+            yield (current_time, on_core(SELECTED, core), current, remaining[current])
+            running[core] = current
+            slice_start[core] = current_time
+            length = remaining[current] if quantum is None else min(quantum, remaining[current])
+            heapq.heappush(heap, (min(current_time + length, run_for), core, generation[core]))
+            if preemptive:
+                heapq.heappush(longest, (-(current_time + remaining[current]), -arrival[current], -current, core))
+                if len(longest) > 2 * cpus:
+                    # Drop the stale entries, so the heap stays O(cores)
+                    longest = [entry for entry in longest if running_slice(entry)]
+                    heapq.heapify(longest)
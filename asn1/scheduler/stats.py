@@ -0,0 +1,244 @@
+# Aggregate statistics over a run: count, mean, max and quantiles of wait,
+# turnaround and response, without a line per process.
+#
+#     python scheduler-gpt.py inputs/big.in --stats     # actual/big.stats.json
+#     python -m scheduler.stats shard-*.stats.json      # merged summary
+#
+# The quantiles come from a mergeable sketch: values are counted in
+# logarithmic buckets (bucket i holds (gamma**(i-1), gamma**i]), so any
+# quantile is within RELATIVE_ACCURACY of the true value and the sketch
+# holds at most a few thousand counters however many processes it has
+# seen. Two sketches with the same accuracy merge by adding their bucket
+# counts, so runs over separate shards of a workload combine into the
+# sketch of the whole.
+#
+# The sketches are fed as processes finish, from the run's FINISHED
+# events. Processes that haven't finished by runfor are counted apart:
+# "starved" ones were never selected (the per-process summary shows them
+# with response 0), "unfinished" ones were selected but not done. The
+# response of an unfinished process still counts, as in summary_metrics.
+
+import json
+import math
+import sys
+
+from .log import FINISHED, KIND_MASK
+from .runner import scheduler_events
+from .table import NOT_STARTED
+
+RELATIVE_ACCURACY = 0.01
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+SMALL_VALUES = 4096  # Values below this look their bucket up in a table instead of taking a log
+METRICS = ("wait", "turnaround", "response")
+
+# Bucket index of every small value, per accuracy
+small_indices = {}
+
+class QuantileSketch:
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}  # Bucket index -> count, for positive values
+        self.zeros = 0  # Values of 0 (or less)
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+        if relative_accuracy not in small_indices:
+            small_indices[relative_accuracy] = [0] + [self.index(value) for value in range(1, SMALL_VALUES)]
+        self.small = small_indices[relative_accuracy]
+
+    def index(self, value):
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if self.maximum is None:
+            self.minimum = self.maximum = value
+        elif value > self.maximum:
+            self.maximum = value
+        elif value < self.minimum:
+            self.minimum = value
+        if value <= 0:
+            self.zeros += 1
+            return
+        index = self.small[value] if value < SMALL_VALUES else self.index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    # Add another sketch's values to this one
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Only sketches with the same accuracy can be merged.")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        for value in (other.minimum, other.maximum):
+            if value is not None:
+                self.minimum = value if self.minimum is None else min(self.minimum, value)
+                self.maximum = value if self.maximum is None else max(self.maximum, value)
+        return self
+
+    # Value at quantile q (0 to 1), by nearest rank, within the relative accuracy
+    def quantile(self, q):
+        if not self.count:
+            return 0
+        rank = max(math.ceil(q * self.count), 1)
+        seen = self.zeros
+        if rank <= seen:
+            return 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank <= seen:
+                # Middle of the bucket, which is within the accuracy of both
+                # ends. Not rounded: a bucket can hold two integers (58 and
+                # 59 at 1%), and neither is within 1% of the other.
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.minimum), self.maximum)
+        return self.maximum
+
+    def summary(self):
+        summary = {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.maximum or 0,
+        }
+        for q in QUANTILES:
+            summary[f"p{q * 100:g}"] = self.quantile(q)
+        return summary
+
+    def to_dict(self):
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "zeros": self.zeros,
+            "count": self.count,
+            "total": self.total,
+            "min": self.minimum,
+            "max": self.maximum,
+            "buckets": [[index, count] for index, count in sorted(self.buckets.items())],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["relative_accuracy"])
+        sketch.zeros, sketch.count, sketch.total = data["zeros"], data["count"], data["total"]
+        sketch.minimum, sketch.maximum = data["min"], data["max"]
+        sketch.buckets = {index: count for index, count in data["buckets"]}
+        return sketch
+
+# Sketches of a run's wait, turnaround and response, plus the processes
+# that didn't finish
+class RunStatistics:
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY):
+        self.sketches = {metric: QuantileSketch(relative_accuracy) for metric in METRICS}
+        self.processes = 0
+        self.starved = 0  # Never selected
+        self.unfinished = 0  # Selected but not done by runfor
+
+    # Pass a run's events through, adding each process to the sketches as it finishes
+    def observe(self, processes, events):
+        wait, turnaround, response = (self.sketches[metric].add for metric in METRICS)
+        for event in events:
+            if event[1] & KIND_MASK == FINISHED:
+                index = event[2]
+                wait(processes.wait[index])
+                turnaround(processes.turnaround[index])
+                response(processes.response[index])
+            yield event
+
+    # Count the processes left over once the run is over
+    def close(self, processes):
+        self.processes += len(processes)
+        remaining, response = processes.remaining, processes.response
+        for index in range(len(processes)):
+            if remaining[index]:
+                if response[index] == NOT_STARTED:
+                    self.starved += 1
+                else:
+                    self.unfinished += 1
+                    self.sketches["response"].add(response[index])
+
+    def merge(self, other):
+        for metric in METRICS:
+            self.sketches[metric].merge(other.sketches[metric])
+        self.processes += other.processes
+        self.starved += other.starved
+        self.unfinished += other.unfinished
+        return self
+
+    def summary(self):
+        return {
+            "processes": self.processes,
+            "finished": self.sketches["wait"].count,
+            "starved": self.starved,
+            "unfinished": self.unfinished,
+            **{metric: self.sketches[metric].summary() for metric in METRICS},
+        }
+
+    def to_dict(self):
+        return {
+            "processes": self.processes,
+            "starved": self.starved,
+            "unfinished": self.unfinished,
+            "sketches": {metric: self.sketches[metric].to_dict() for metric in METRICS},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        statistics = cls()
+        statistics.sketches = {metric: QuantileSketch.from_dict(data["sketches"][metric]) for metric in METRICS}
+        statistics.processes, statistics.starved, statistics.unfinished = data["processes"], data["starved"], data["unfinished"]
+        return statistics
+
+# Run an algorithm over a process table and return its statistics. The
+# events are never formatted, and the algorithms' fast paths are skipped
+# since they don't produce the FINISHED events the sketches are fed from.
+def run_statistics(processes, run_for, algorithm, cpus=1, relative_accuracy=RELATIVE_ACCURACY, **params):
+    statistics = RunStatistics(relative_accuracy)
+    _, events = scheduler_events(processes, run_for, algorithm, cpus, **params)
+    for _ in statistics.observe(processes, events):
+        pass
+    statistics.close(processes)
+    return statistics
+
+def write_statistics(output_file, statistics):
+    with open(output_file, 'w') as file:
+        json.dump({"summary": statistics.summary(), **statistics.to_dict()}, file, indent=2)
+        file.write("\n")
+
+def read_statistics(input_file):
+    with open(input_file) as file:
+        return RunStatistics.from_dict(json.load(file))
+
+# One line per metric, then the process counts
+def statistics_lines(summary):
+    lines = []
+    for metric in METRICS:
+        values = summary[metric]
+        lines.append(f"{metric:<10} " + " ".join(f"{key} {value:.2f}" if isinstance(value, float) else f"{key} {value}"
+                                                 for key, value in values.items()))
+    lines.append(f"processes {summary['processes']} finished {summary['finished']} "
+                 f"starved {summary['starved']} unfinished {summary['unfinished']}")
+    return lines
+
+# Merge the statistics files of several shards and print the summary
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Usage: python -m scheduler.stats <stats file> [<stats file> ...]")
+        sys.exit(1)
+    try:
+        statistics = read_statistics(argv[0])
+        for input_file in argv[1:]:
+            statistics.merge(read_statistics(input_file))
+    except (OSError, ValueError, KeyError) as error:
+        print(f"Error: {error}")
+        sys.exit(1)
+    for line in statistics_lines(statistics.summary()):
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+# Process table and arrival stream shared by every scheduler
+
+import heapq
+import sys
+from array import array
+
+from .log import ARRIVED, BLOCKED, FINISHED, WOKEN
+from .timerwheel import TimerWheel
+
+# Sentinel stored in the start/response columns until a process first runs
+NOT_STARTED = -1
+
+# Tickets a process gets when its "process" line doesn't give any
+DEFAULT_TICKETS = 100
+
+# Struct-of-arrays process table. Every per-process field lives in its own
+# typed array column (8 bytes per value) instead of a per-object __dict__,
+# so a process costs a few dozen bytes and the GC never has to walk them.
+# Names are interned and kept in a separate list. Processes are identified
+# by their index into the columns.
+class ProcessTable:
+    def __init__(self):
+        self.names = []  # Process names (interned)
+        self.arrival = array('q')  # Arrival time of each process
+        self.burst = array('q')  # Burst time (execution time) of each process
+        self.remaining = array('q')  # Remaining burst time for each process
+        self.wait = array('q')  # Wait time (calculated later)
+        self.turnaround = array('q')  # Turnaround time (calculated later)
+        self.response = array('q')  # Response time, NOT_STARTED until selected
+        self.start = array('q')  # Start time, NOT_STARTED until selected
+        self.tickets = array('q')  # Share of the CPU for stride/lottery scheduling
+        # Processes with I/O: after its first CPU burst, process i alternates
+        # (I/O, CPU) bursts from io_phases[io_offset[i]:io_offset[i + 1]].
+        # burst holds the total CPU time and remaining the current CPU burst.
+        self.io_offset = array('q', [0])
+        self.io_phases = array('q')
+        self.phase = array('q')  # Next entry of io_phases for each process
+
+    # Table over existing read-only arrival/burst/tickets buffers (e.g. shared
+    # memory), with fresh per-run columns for everything the schedulers write
+    @classmethod
+    def from_columns(cls, names, arrival, burst, tickets=None, io_offset=None, io_phases=None):
+        table = cls()
+        table.names = names
+        table.arrival = arrival
+        table.burst = burst
+        table.tickets = tickets if tickets is not None else array('q', [DEFAULT_TICKETS]) * len(names)
+        table.remaining = array('q', burst)
+        if io_phases is not None and len(io_phases):
+            table.io_offset = io_offset
+            table.io_phases = io_phases
+            table.phase = array('q', io_offset[:len(names)])
+            for index in range(len(names)):
+                # The first CPU burst is what is left after the later ones
+                table.remaining[index] -= sum(io_phases[io_offset[index] + 1:io_offset[index + 1]:2])
+        else:
+            table.io_offset = array('q', bytes(8 * (len(names) + 1)))
+            table.phase = array('q', bytes(8 * len(names)))
+        table.wait = array('q', bytes(8 * len(names)))
+        table.turnaround = array('q', bytes(8 * len(names)))
+        table.response = array('q', [NOT_STARTED]) * len(names)
+        table.start = array('q', [NOT_STARTED]) * len(names)
+        return table
+
+    def __len__(self):
+        return len(self.names)
+
+    # Whether any process has I/O bursts
+    def has_io(self):
+        return len(self.io_phases) > 0
+
+    # Append a process and return its index. bursts are its CPU bursts
+    # alternating with I/O bursts, starting and ending with a CPU burst.
+    def add(self, name, arrival, bursts, tickets=DEFAULT_TICKETS):
+        if isinstance(bursts, int):
+            bursts = (bursts,)
+        self.names.append(sys.intern(name))
+        self.arrival.append(arrival)
+        self.burst.append(sum(bursts[::2]))
+        self.remaining.append(bursts[0])
+        self.phase.append(self.io_offset[-1])
+        self.io_phases.extend(bursts[1:])
+        self.io_offset.append(len(self.io_phases))
+        self.wait.append(0)
+        self.turnaround.append(0)
+        self.response.append(NOT_STARTED)
+        self.start.append(NOT_STARTED)
+        self.tickets.append(tickets)
+        return len(self.names) - 1
+
+    # Arrival stream over the table, for a scheduler to run from (a live
+    # table handing out processes as they come in overrides this)
+    def arrival_cursor(self):
+        return ArrivalCursor(self)
+
+    # Class a scheduler builds its ready queue from. A profiled table
+    # returns a subclass that counts the queue's operations (see
+    # profiling.py); here it is the class itself, so a normal run pays
+    # nothing.
+    def queue_class(self, cls):
+        return cls
+
+    # (heappush, heappop) for a scheduler's ready heap, likewise
+    def heap_operations(self):
+        return heapq.heappush, heapq.heappop
+
+    # Lightweight object view of one row, for code that wants attributes
+    def process(self, index):
+        return Process(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.names)):
+            yield Process(self, index)
+
+# Read/write view of one row of a ProcessTable. Holds only the table and
+# the row index, and exposes the attribute names the old Process class had.
+class Process:
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    @property
+    def name(self):
+        return self.table.names[self.index]
+
+    @property
+    def arrival(self):
+        return self.table.arrival[self.index]
+
+    @property
+    def burst(self):
+        return self.table.burst[self.index]
+
+    @property
+    def tickets(self):
+        return self.table.tickets[self.index]
+
+    # CPU and I/O bursts, alternating, as given on the "process" line
+    @property
+    def bursts(self):
+        table, index = self.table, self.index
+        phases = table.io_phases[table.io_offset[index]:table.io_offset[index + 1]]
+        return [table.burst[index] - sum(phases[1::2])] + phases.tolist()
+
+    @property
+    def remaining_time(self):
+        return self.table.remaining[self.index]
+
+    @remaining_time.setter
+    def remaining_time(self, value):
+        self.table.remaining[self.index] = value
+
+    @property
+    def wait_time(self):
+        return self.table.wait[self.index]
+
+    @property
+    def turnaround_time(self):
+        return self.table.turnaround[self.index]
+
+    @property
+    def response_time(self):
+        response = self.table.response[self.index]
+        return None if response == NOT_STARTED else response
+
+    @property
+    def start_time(self):
+        start = self.table.start[self.index]
+        return None if start == NOT_STARTED else start
+
+# Arrival stream shared by all schedulers. Processes are ordered by arrival
+# once up front (ties keep input order), and the cursor only ever moves
+# forward, so handing out every process that arrives in (t_prev, t_now]
+# costs amortized O(1) per process instead of a scan of the whole list.
+# Processes are tracked by their index, so two processes that share a
+# name are still two separate arrivals.
+#
+# With I/O bursts the cursor also hands back processes whose I/O is done.
+# Blocked processes sit on a timer wheel, so blocking and waking cost O(1)
+# each and never look at the rest of the table.
+class ArrivalCursor:
+    def __init__(self, table):
+        self.table = table
+        self.arrival = table.arrival  # Arrival column of the process table
+        self.order = sorted(range(len(table)), key=table.arrival.__getitem__)  # Indices by arrival
+        self.position = 0  # Next entry of self.order to hand out
+        self.wheel = TimerWheel() if table.has_io() else None  # Blocked processes by wake time
+
+    # Time of the next arrival or wakeup, or None once nothing is left to come
+    def next_time(self):
+        arrival = None
+        if self.position < len(self.order):
+            arrival = self.arrival[self.order[self.position]]
+        if self.wheel is None or not self.wheel:
+            return arrival
+        wakeup = self.wheel.next_expiry()
+        return wakeup if arrival is None else min(arrival, wakeup)
+
+    # Yield an ARRIVED (or WOKEN) event for every process that arrives (or
+    # comes back from I/O) at or before t_now, in time order. At the same
+    # time arrivals come before wakeups.
+    def advance(self, t_now):
+        arrival, order = self.arrival, self.order
+        while self.position < len(order):
+            index = order[self.position]
+            time = arrival[index]
+            if time > t_now:
+                break
+            if self.wheel is not None and self.wheel and self.wheel.next_expiry() < time:
+                yield from self.wake(self.wheel.next_expiry())
+                continue
+            self.position += 1
+            yield (time, ARRIVED, index, 0)
+        if self.wheel is not None:
+            yield from self.wake(t_now)
+
+    def wake(self, t_now):
+        wheel = self.wheel
+        while wheel and wheel.next_expiry() <= t_now:
+            time = wheel.next_expiry()
+            for index in wheel.advance(time):
+                yield (time, WOKEN, index, 0)
+
+    # A CPU burst of index ended at time t. Block it on its next I/O burst
+    # if it has one, otherwise finish it and fill in its turnaround and
+    # wait (time spent ready but not running). Returns the event to log.
+    def complete(self, index, t):
+        table = self.table
+        phase = table.phase[index]
+        if phase < table.io_offset[index + 1]:
+            wake_time = t + table.io_phases[phase]
+            table.remaining[index] = table.io_phases[phase + 1]
+            table.phase[index] = phase + 2
+            self.wheel.arm(index, wake_time)
+            return (t, BLOCKED, index, wake_time)
+        table.turnaround[index] = t - table.arrival[index]
+        offset = table.io_offset[index]
+        io_time = sum(table.io_phases[offset:phase:2]) if phase > offset else 0
+        table.wait[index] = table.turnaround[index] - table.burst[index] - io_time
+        return (t, FINISHED, index, 0)
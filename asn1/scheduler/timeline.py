@@ -0,0 +1,452 @@
+# Time-indexed queries over a finished run: what was running (and how
+# long the ready queue was) at a given time, a process's own events, and
+# the ready queue over an interval.
+#
+#     timeline = Timeline.from_trace("actual/big.trace")
+#     timeline.state_at(734210)        # {"time", "running" (per CPU), "ready"}
+#     timeline.first_selected("P12345")
+#     timeline.ready_between(1000, 2000)
+#
+#     python -m scheduler.timeline actual/big.trace at 734210
+#
+# The events stay packed as binary trace records (a memory-mapped .trace
+# file, or a buffer packed from a run's events), so nothing is decoded
+# until it is queried. One pass over them (on the first query that needs
+# it) builds:
+#   - per CPU, the sorted run intervals (start, end, process) in typed
+#     arrays, and the ready queue length after each distinct event time.
+#     state_at and running_between bisect these, so they cost O(log n)
+#     (plus the intervals returned).
+#   - per block of BLOCK_SIZE records, the state at its start and the
+#     ready queue's integral, minimum and maximum over it. ready_between
+#     looks whole blocks up in the prefix integrals and a sparse table of
+#     the block extremes, and decodes and replays the (at most two) partial
+#     blocks at its ends, so it costs O(log n) plus two blocks. Decoded
+#     blocks are kept in a small cache.
+# The intervals and steps take 24 and 16 bytes each next to the records.
+# Each process's record numbers are indexed, in one more pass, on the
+# first per-process query.
+#
+# A process runs on a CPU from its "selected" until the next selection,
+# finish, block or idle on that CPU; one that is preempted goes back to
+# the ready queue. Several events at the same time count as one step: the
+# state at time t is the state after all of them.
+
+import mmap
+import sys
+from array import array
+from bisect import bisect_right
+
+from .log import ARRIVED, BLOCKED, CORE_SHIFT, FINISHED, IDLE, KIND_MASK, SELECTED, WOKEN
+from .trace import TRACE_HEADER_SIZE, TRACE_RECORD, read_trace_header, read_trace_metadata
+
+BLOCK_SIZE = 4096  # Records per block
+CACHED_BLOCKS = 64  # Decoded blocks kept around
+FOREVER = float("inf")
+OPEN_END = sys.maxsize  # End of a run interval still going when the run ends
+
+class Timeline:
+    def __init__(self, records, count, names=None, load_names=None):
+        self.records = records  # Buffer of packed trace records
+        self.count = count
+        self.names_value = names
+        self.load_names = load_names  # Called for the names the first time they are needed
+        self.close_source = None
+        self.blocks = {}  # Block number -> decoded records, most recently used last
+        self.starts = None  # Block summaries, built by index_blocks()
+        self.intervals = None  # Per CPU (starts, ends, processes) of its run intervals, built by index_blocks()
+        self.steps = None  # (times, ready lengths) after each distinct event time, built by index_blocks()
+        self.process_offsets = None  # Per-process record numbers, built by index_processes()
+        self.process_records = None
+        self.name_index = None
+
+    # Timeline over a saved binary trace (see trace.py). Only the header is
+    # read here; the records are memory-mapped and the names are read from
+    # the trailer when first needed.
+    @classmethod
+    def from_trace(cls, trace_file):
+        count, _, _ = read_trace_header(trace_file)
+        load_names = lambda: read_trace_metadata(trace_file)["names"]
+        if not count:
+            return cls(b"", 0, load_names=load_names)
+        with open(trace_file, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        records = memoryview(mapped)[TRACE_HEADER_SIZE:TRACE_HEADER_SIZE + count * TRACE_RECORD.size]
+        timeline = cls(records, count, load_names=load_names)
+
+        def close():
+            records.release()
+            mapped.close()
+
+        timeline.close_source = close
+        return timeline
+
+    # Timeline over a run's events, packed into memory as they come
+    @classmethod
+    def from_events(cls, names, events):
+        records = bytearray()
+        count = 0
+        for event in events:
+            records += TRACE_RECORD.pack(*event)
+            count += 1
+        return cls(records, count, names=names)
+
+    def close(self):
+        if self.close_source is not None:
+            self.close_source()
+            self.close_source = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def names(self):
+        if self.names_value is None:
+            self.names_value = self.load_names()
+        return self.names_value
+
+    # Row of a process given by name or row number
+    def process_index(self, process):
+        if isinstance(process, int):
+            return process
+        if self.name_index is None:
+            self.name_index = {name: index for index, name in enumerate(self.names)}
+        if process not in self.name_index:
+            raise ValueError(f"No process named {process}.")
+        return self.name_index[process]
+
+    # Decoded records of block k
+    def block(self, k):
+        records = self.blocks.pop(k, None)
+        if records is None:
+            size = TRACE_RECORD.size
+            end = min((k + 1) * BLOCK_SIZE, self.count)
+            records = list(TRACE_RECORD.iter_unpack(self.records[k * BLOCK_SIZE * size:end * size]))
+            if len(self.blocks) >= CACHED_BLOCKS:
+                del self.blocks[next(iter(self.blocks))]  # Least recently used
+        self.blocks[k] = records
+        return records
+
+    # One pass over every record, keeping the per-CPU run intervals, the
+    # ready queue length after each event time, and the state at each block
+    # start with the ready queue's integral and extremes over each block
+    def index_blocks(self):
+        if self.starts is not None:
+            return
+        block_times = []  # Time of each block's first record
+        block_running = []  # Running process per CPU at each block start
+        block_since = []  # Time each of those started running
+        block_ready = []  # Ready queue length at each block start
+        area_before = [0]  # Integral of the ready queue length up to each block's first segment
+        block_min = []
+        block_max = []
+        intervals = []  # Per CPU (starts, ends, processes)
+        step_times, step_ready = array('q'), array('q')
+        state = ReplayState()
+        running, since = state.running, state.since
+        current_time = None
+        size = TRACE_RECORD.size
+        for k in range((self.count + BLOCK_SIZE - 1) // BLOCK_SIZE):
+            block_times.append(None)
+            block_running.append(tuple(state.running))
+            block_since.append(tuple(state.since))
+            block_ready.append(state.ready)
+            block_min.append(None)
+            block_max.append(None)
+            area_before.append(area_before[-1])
+            end = min((k + 1) * BLOCK_SIZE, self.count)
+            for record in TRACE_RECORD.iter_unpack(self.records[k * BLOCK_SIZE * size:end * size]):
+                time = record[0]
+                if block_times[k] is None:
+                    block_times[k] = time
+                if current_time is not None and time > current_time:
+                    # The segment since the last time belongs to the block of that time's last record
+                    owner = k if block_times[k] < time else k - 1
+                    value = state.ready
+                    area_before[owner + 1] += value * (time - current_time)
+                    block_min[owner] = value if block_min[owner] is None else min(block_min[owner], value)
+                    block_max[owner] = value if block_max[owner] is None else max(block_max[owner], value)
+                    for later in range(owner + 2, k + 2):
+                        area_before[later] = area_before[owner + 1]
+                if current_time is not None and time > current_time:
+                    step_times.append(current_time)
+                    step_ready.append(state.ready)
+                current_time = time
+                core = core_of(record[1])
+                before = running[core] if core < len(running) else None
+                if before is not None:
+                    started = since[core]
+                state.apply(record)
+                if before is not None and (running[core] != before or since[core] != started) and time > started:
+                    while len(intervals) <= core:
+                        intervals.append((array('q'), array('q'), array('q')))
+                    add_interval(intervals[core], started, time, before)
+
+        # The last segment runs on forever
+        if self.count:
+            step_times.append(current_time)
+            step_ready.append(state.ready)
+            for core, process in enumerate(running):
+                while len(intervals) <= core:
+                    intervals.append((array('q'), array('q'), array('q')))
+                if process is not None:
+                    add_interval(intervals[core], since[core], OPEN_END, process)
+            last = len(block_times) - 1
+            value = state.ready
+            block_min[last] = value if block_min[last] is None else min(block_min[last], value)
+            block_max[last] = value if block_max[last] is None else max(block_max[last], value)
+        self.starts = (block_times, block_running, block_since, block_ready, area_before)
+        self.extremes = (SparseTable(block_min, min), SparseTable(block_max, max))
+        self.intervals = intervals
+        self.steps = (step_times, step_ready)
+        self.cpus = max(len(state.running), 1)
+
+    # Block holding the state at time t (the last block starting at or before t), or -1
+    def block_at(self, t):
+        return bisect_right(self.starts[0], t) - 1
+
+    # Replay block k: yields (start, end, ready length) for each segment the
+    # block owns, with the running state after each step in state
+    def segments(self, k, state):
+        block_times = self.starts[0]
+        records = self.block(k)
+        current_time = None
+        for record in records:
+            time = record[0]
+            if current_time is not None and time > current_time:
+                yield current_time, time, state.ready
+            current_time = time
+            state.apply(record)
+        if k + 1 < len(block_times):
+            if block_times[k + 1] > current_time:
+                yield current_time, block_times[k + 1], state.ready
+        else:
+            yield current_time, FOREVER, state.ready
+
+    def start_state(self, k):
+        _, block_running, block_since, block_ready, _ = self.starts
+        return ReplayState(list(block_running[k]), list(block_since[k]), block_ready[k])
+
+    # State after every event at or before time t: the running process per
+    # CPU (by name, None for an idle CPU) and the ready queue length
+    def state_at(self, t):
+        self.index_blocks()
+        running = [self.running_at(t, cpu) for cpu in range(self.cpus)]
+        step_times, step_ready = self.steps
+        step = bisect_right(step_times, t) - 1
+        return {"time": t, "running": running, "ready": step_ready[step] if step >= 0 else 0}
+
+    # Name of the process running on a CPU at time t, or None while it is idle
+    def running_at(self, t, cpu=0):
+        self.index_blocks()
+        if cpu >= len(self.intervals):
+            return None
+        starts, ends, processes = self.intervals[cpu]
+        position = bisect_right(starts, t) - 1
+        if position >= 0 and ends[position] > t:
+            return self.names[processes[position]]
+        return None
+
+    # (start, end, process name) for every stretch a process ran on the CPU
+    # that overlaps [start, end). A stretch still running at end has end None.
+    def running_between(self, start, end, cpu=0):
+        self.index_blocks()
+        if cpu >= len(self.intervals):
+            return []
+        starts, ends, processes = self.intervals[cpu]
+        names = self.names
+        result = []
+        position = bisect_right(ends, start)  # First stretch ending after start
+        while position < len(starts) and starts[position] < end:
+            stretch_end = ends[position]
+            result.append((starts[position], None if stretch_end >= end else stretch_end, names[processes[position]]))
+            position += 1
+        return result
+
+    # Ready queue length at time t
+    def ready_at(self, t):
+        return self.state_at(t)["ready"]
+
+    # Minimum, maximum and time-weighted mean of the ready queue length over [start, end)
+    def ready_between(self, start, end):
+        if end <= start:
+            raise ValueError("Interval must end after it starts.")
+        self.index_blocks()
+        block_times, _, _, _, area_before = self.starts
+        low = high = None
+        area = 0
+
+        def add(value, duration):
+            nonlocal low, high, area
+            low = value if low is None else min(low, value)
+            high = value if high is None else max(high, value)
+            area += value * duration
+
+        # Before the first event the queue is empty
+        first = block_times[0] if block_times else FOREVER
+        if start < first:
+            add(0, min(end, first) - start)
+
+        # Partial blocks at either end are replayed, the whole blocks
+        # between them are looked up
+        first_block = max(self.block_at(start), 0)
+        last_block = self.block_at(end - 1) if block_times else -1
+        for k in sorted({first_block, last_block}) if last_block >= 0 else []:
+            for segment_start, segment_end, value in self.segments(k, self.start_state(k)):
+                overlap = min(segment_end, end) - max(segment_start, start)
+                if overlap > 0:
+                    add(value, overlap)
+        if last_block - first_block > 1:
+            lows, highs = self.extremes
+            inner_low = lows.query(first_block + 1, last_block)
+            inner_high = highs.query(first_block + 1, last_block)
+            if inner_low is not None:
+                add(inner_low, 0)
+                add(inner_high, 0)
+            area += area_before[last_block] - area_before[first_block + 1]
+        return {"min": low or 0, "max": high or 0, "mean": area / (end - start)}
+
+    # Record numbers of each process's events, grouped by process, from
+    # one pass over the records
+    def index_processes(self):
+        if self.process_offsets is not None:
+            return
+        per_process = [None] * len(self.names)
+        for number, (_, _, index, _) in enumerate(TRACE_RECORD.iter_unpack(self.records)):
+            if index >= 0:
+                if per_process[index] is None:
+                    per_process[index] = array('q')
+                per_process[index].append(number)
+        offsets = array('q', [0])
+        numbers = array('q')
+        for records in per_process:
+            if records is not None:
+                numbers.extend(records)
+            offsets.append(len(numbers))
+        self.process_offsets, self.process_records = offsets, numbers
+
+    # A process's events, in time order, as (time, kind, index, value) tuples
+    def process_events(self, process):
+        index = self.process_index(process)
+        self.index_processes()
+        size = TRACE_RECORD.size
+        numbers = self.process_records[self.process_offsets[index]:self.process_offsets[index + 1]]
+        return [TRACE_RECORD.unpack_from(self.records, number * size) for number in numbers]
+
+    # Time a process was first selected, or None if it never was
+    def first_selected(self, process):
+        for time, kind, _, _ in self.process_events(process):
+            if kind & KIND_MASK == SELECTED:
+                return time
+        return None
+
+# Who is running where (and since when), and how many processes are
+# ready, while replaying records
+class ReplayState:
+    def __init__(self, running=None, since=None, ready=0):
+        self.running = running if running is not None else []  # Process per CPU, None while idle
+        self.since = since if since is not None else []  # Time the running process was selected
+        self.ready = ready
+
+    def apply(self, record):
+        time, kind, index, _ = record
+        plain = kind & KIND_MASK
+        if plain == ARRIVED or plain == WOKEN:
+            self.ready += 1
+            return
+        if plain not in (SELECTED, FINISHED, BLOCKED, IDLE):
+            return
+        core = core_of(kind)
+        running = self.running
+        while len(running) <= core:
+            running.append(None)
+            self.since.append(None)
+        if plain == SELECTED:
+            previous = running[core]
+            if previous != index:
+                self.ready -= 1  # Leaves the ready queue...
+                if previous is not None:
+                    self.ready += 1  # ...and the process it preempts goes back
+                running[core] = index
+                self.since[core] = time
+        else:
+            running[core] = None
+            self.since[core] = None
+
+# Append a run interval to a CPU's (starts, ends, processes) arrays
+def add_interval(interval_arrays, start, end, process):
+    starts, ends, processes = interval_arrays
+    starts.append(start)
+    ends.append(end)
+    processes.append(process)
+
+# CPU of an event (0 on a one-CPU run)
+def core_of(kind):
+    return (kind >> CORE_SHIFT) - 1 if kind >> CORE_SHIFT else 0
+
+# Range minimum or maximum over a fixed list in O(1), skipping None entries
+class SparseTable:
+    def __init__(self, values, pick):
+        self.pick = pick
+        self.levels = [list(values)]
+        width = 1
+        while 2 * width <= len(values):
+            previous = self.levels[-1]
+            self.levels.append([self.combine(previous[k], previous[k + width]) for k in range(len(values) - 2 * width + 1)])
+            width *= 2
+
+    def combine(self, a, b):
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return self.pick(a, b)
+
+    # Extreme of values[start:end], or None if they are all None
+    def query(self, start, end):
+        if end <= start:
+            return None
+        level = (end - start).bit_length() - 1
+        row = self.levels[level]
+        return self.combine(row[start], row[end - (1 << level)])
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    usage = ("Usage: python -m scheduler.timeline <trace file> at TIME\n"
+             "       python -m scheduler.timeline <trace file> process NAME\n"
+             "       python -m scheduler.timeline <trace file> ready START END\n"
+             "       python -m scheduler.timeline <trace file> running START END [CPU]")
+    if len(argv) < 3:
+        print(usage)
+        sys.exit(1)
+    from .log import event_lines
+    try:
+        with Timeline.from_trace(argv[0]) as timeline:
+            query, arguments = argv[1], argv[2:]
+            if query == "at":
+                state = timeline.state_at(int(arguments[0]))
+                for cpu, name in enumerate(state["running"]):
+                    print(f"CPU {cpu:>2} : {name or 'Idle'}")
+                print(f"Ready  : {state['ready']}")
+            elif query == "process":
+                for line in event_lines(timeline.names, timeline.process_events(arguments[0])):
+                    print(line)
+            elif query == "ready" and len(arguments) == 2:
+                summary = timeline.ready_between(int(arguments[0]), int(arguments[1]))
+                print(f"min {summary['min']} max {summary['max']} mean {summary['mean']:.2f}")
+            elif query == "running" and len(arguments) in (2, 3):
+                cpu = int(arguments[2]) if len(arguments) == 3 else 0
+                for start, end, name in timeline.running_between(int(arguments[0]), int(arguments[1]), cpu):
+                    print(f"{start:>6} - {'' if end is None else end:>6} : {name}")
+            else:
+                print(usage)
+                sys.exit(1)
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
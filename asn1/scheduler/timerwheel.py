@@ -0,0 +1,104 @@
+# Hierarchical timer wheel for I/O completions.
+#
+# WHEEL_LEVELS wheels of 64 slots each. A timer goes on the level of the
+# highest 6-bit group in which its expiry differs from the wheel's current
+# time, in the slot given by that group of the expiry. So level 0 slot s
+# holds timers for exactly one tick, and higher levels hold whole ranges
+# that are cascaded down once the wheel's time reaches them. Arming is
+# O(1), and each timer is moved at most WHEEL_LEVELS times before it
+# expires. A 64-bit occupancy bitmap per level finds the next non-empty
+# slot without looking at empty ones, so long idle gaps cost nothing.
+# Timers past the top level wait in an overflow list.
+
+WHEEL_BITS = 6
+WHEEL_SLOTS = 1 << WHEEL_BITS
+WHEEL_LEVELS = 4  # Levels 0..3 cover 2**24 ticks ahead
+
+class TimerWheel:
+    def __init__(self, now=0):
+        self.now = now  # Every timer expiring before now has been handed out
+        self.slots = [[[] for _ in range(WHEEL_SLOTS)] for _ in range(WHEEL_LEVELS)]
+        self.occupied = [0] * WHEEL_LEVELS  # Bit s of level k is set while slots[k][s] is non-empty
+        self.overflow = []  # (expiry, item) for timers beyond the top level
+        self.count = 0  # Timers armed and not yet expired
+        self.earliest = None  # Cached next expiry, None when unknown or empty
+
+    def __len__(self):
+        return self.count
+
+    # Arm a timer that hands out item at time expiry (expiry >= now)
+    def arm(self, item, expiry):
+        self.place(item, expiry)
+        self.count += 1
+        if self.earliest is not None and expiry < self.earliest:
+            self.earliest = expiry
+
+    def place(self, item, expiry):
+        level = ((expiry ^ self.now).bit_length() - 1) // WHEEL_BITS if expiry != self.now else 0
+        if level >= WHEEL_LEVELS:
+            self.overflow.append((expiry, item))
+            return
+        slot = (expiry >> (WHEEL_BITS * level)) & (WHEEL_SLOTS - 1)
+        self.slots[level][slot].append((expiry, item))
+        self.occupied[level] |= 1 << slot
+
+    # Time of the earliest armed timer, or None if there are none. Levels
+    # hold later and later ranges, so it is in the lowest occupied slot of
+    # the lowest occupied level; only above level 0 does that slot mix
+    # several times and need a look at its entries.
+    def next_expiry(self):
+        if self.earliest is not None or not self.count:
+            return self.earliest
+        for level in range(WHEEL_LEVELS):
+            occupied = self.occupied[level]
+            if occupied:
+                slot = (occupied & -occupied).bit_length() - 1
+                if level == 0:
+                    self.earliest = (self.now & ~(WHEEL_SLOTS - 1)) | slot
+                else:
+                    self.earliest = min(entry[0] for entry in self.slots[level][slot])
+                return self.earliest
+        self.earliest = min(entry[0] for entry in self.overflow)
+        return self.earliest
+
+    # Yield every item whose timer expires at or before t, in expiry order
+    # (items armed for the same time come out in the order they were armed)
+    def advance(self, t):
+        while self.count:
+            expiry = self.next_expiry()
+            if expiry > t:
+                return
+            self.move_to(expiry)
+            slot = expiry & (WHEEL_SLOTS - 1)
+            entries = self.slots[0][slot]
+            self.slots[0][slot] = []
+            self.occupied[0] &= ~(1 << slot)
+            self.count -= len(entries)
+            self.earliest = None
+            for _, item in entries:
+                yield item
+
+    # Move the wheel's time forward to t (no timer expires before t), and
+    # cascade the slots that t falls into down to the levels below them
+    def move_to(self, t):
+        previous, self.now = self.now, t
+        if previous >> (WHEEL_BITS * WHEEL_LEVELS) != t >> (WHEEL_BITS * WHEEL_LEVELS):
+            overflow, self.overflow = self.overflow, []
+            for expiry, item in overflow:
+                self.place(item, expiry)
+        for level in range(WHEEL_LEVELS - 1, 0, -1):
+            # Only the slot t falls into can hold timers that now belong lower
+            slot = (t >> (WHEEL_BITS * level)) & (WHEEL_SLOTS - 1)
+            if self.occupied[level] >> slot & 1:
+                entries = self.slots[level][slot]
+                self.slots[level][slot] = []
+                self.occupied[level] &= ~(1 << slot)
+                for expiry, item in entries:
+                    self.place(item, expiry)
+
+    # Every armed (expiry, item) in expiry order; items with the same
+    # expiry always share a slot, so they stay in the order they were armed
+    def pending(self):
+        entries = [entry for level in self.slots for slot in level for entry in slot] + self.overflow
+        entries.sort(key=lambda entry: entry[0])
+        return entries
@@ -0,0 +1,101 @@
+# Binary event traces and the text renderer for them
+
+import json
+import mmap
+import struct
+from array import array
+
+from .log import render_log
+from .metrics import load_numpy
+from .table import ProcessTable
+
+# Binary event trace. A 64-byte header, then one fixed-width record per
+# event, then a JSON trailer with what the text renderer needs (names,
+# header lines, runfor and the summary columns). Records are packed as
+# (time int64, kind int32, process int32, value int64), so the record
+# section can be memory-mapped straight into a NumPy structured array.
+TRACE_MAGIC = b"SCHEDTRC"
+TRACE_VERSION = 1
+TRACE_HEADER = struct.Struct("<8sIIQQQ")  # magic, version, record size, count, trailer offset, trailer size
+TRACE_HEADER_SIZE = 64
+TRACE_RECORD = struct.Struct("<qiiq")
+TRACE_DTYPE = [("time", "<i8"), ("kind", "<i4"), ("process", "<i4"), ("value", "<i8")]
+
+# Write events to a binary trace file, packing records in batches
+def write_trace_file(trace_file, processes, run_for, header, events):
+    count = 0
+    with open(trace_file, 'wb') as file:
+        file.write(bytes(TRACE_HEADER_SIZE))  # Filled in once the count is known
+        batch = bytearray()
+        for event in events:
+            batch += TRACE_RECORD.pack(*event)
+            count += 1
+            if len(batch) >= 1 << 20:
+                file.write(batch)
+                batch.clear()
+        file.write(batch)
+
+        # The summary columns are only final after the events have run
+        trailer = json.dumps({
+            "run_for": run_for,
+            "header": header,
+            "names": processes.names,
+            "wait": processes.wait.tolist(),
+            "turnaround": processes.turnaround.tolist(),
+            "response": processes.response.tolist(),
+        }).encode()
+        trailer_offset = TRACE_HEADER_SIZE + count * TRACE_RECORD.size
+        file.write(trailer)
+        file.seek(0)
+        file.write(TRACE_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, TRACE_RECORD.size, count, trailer_offset, len(trailer)))
+
+# Read a trace's header: (record count, trailer offset, trailer size).
+# Raises ValueError if the file isn't a trace.
+def read_trace_header(trace_file):
+    with open(trace_file, 'rb') as file:
+        header = file.read(TRACE_HEADER.size)
+    if len(header) < TRACE_HEADER.size:
+        raise ValueError(f"{trace_file} is not a version {TRACE_VERSION} scheduler trace.")
+    magic, version, record_size, count, trailer_offset, trailer_size = TRACE_HEADER.unpack(header)
+    if magic != TRACE_MAGIC or version != TRACE_VERSION or record_size != TRACE_RECORD.size:
+        raise ValueError(f"{trace_file} is not a version {TRACE_VERSION} scheduler trace.")
+    return count, trailer_offset, trailer_size
+
+# Read a trace's header and trailer; raises ValueError if it isn't a trace
+def read_trace_metadata(trace_file):
+    count, trailer_offset, trailer_size = read_trace_header(trace_file)
+    with open(trace_file, 'rb') as file:
+        file.seek(trailer_offset)
+        metadata = json.loads(file.read(trailer_size))
+    metadata["count"] = count
+    return metadata
+
+# Memory-map the records of a trace as a NumPy structured array (no parsing)
+def load_trace_events(trace_file):
+    numpy = load_numpy()
+    if numpy is None:
+        raise RuntimeError("NumPy is required to load a trace as arrays.")
+    count = read_trace_metadata(trace_file)["count"]
+    return numpy.memmap(trace_file, dtype=numpy.dtype(TRACE_DTYPE), mode='r', offset=TRACE_HEADER_SIZE, shape=(count,))
+
+# Iterate over the records of a trace as event tuples, straight off an mmap
+def iter_trace_events(trace_file, count):
+    if count == 0:
+        return
+    with open(trace_file, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        records = memoryview(mapped)[TRACE_HEADER_SIZE:TRACE_HEADER_SIZE + count * TRACE_RECORD.size]
+        try:
+            yield from TRACE_RECORD.iter_unpack(records)
+        finally:
+            records.release()
+
+# Regenerate the .out text of a run from its binary trace, lazily
+def render_trace(trace_file):
+    metadata = read_trace_metadata(trace_file)
+    processes = ProcessTable()
+    processes.names = metadata["names"]
+    processes.wait = array('q', metadata["wait"])
+    processes.turnaround = array('q', metadata["turnaround"])
+    processes.response = array('q', metadata["response"])
+    events = iter_trace_events(trace_file, metadata["count"])
+    return render_log(processes, metadata["run_for"], metadata["header"], events)
@@ -0,0 +1,302 @@
+import argparse
+import csv
+import gzip
+import json
+import sys
+from collections import deque
+
+# Lock-contention analyzer for the output.txt trace chash writes.
+#
+#     python analyze_log.py output.txt                 # JSON report on stdout
+#     python analyze_log.py big.txt.gz --csv -o report.csv
+#
+# The log is streamed line by line through a generator pipeline (read ->
+# parse -> analyze), so memory stays constant however large it is; only
+# the locks and waits that are still open at any moment are held.
+#
+# The trace has no thread ids, so events are paired the way the threads
+# must have produced them:
+#   - a "... LOCK ACQUIRED" line is written just before the thread asks for
+#     the lock, so it is really the request time. Each "... LOCK RELEASED"
+#     closes the oldest open request of the same mode.
+#   - the lock was granted once it was free: for a write lock, at the
+#     latest release of any lock before this release (or the request, if
+#     later); for a read lock, at the latest write lock release. Wait time
+#     is grant - request and hold time is release - grant.
+#   - deletes and searches write "WAITING ON INSERTS" before blocking on
+#     the inserts condition variable, and main broadcasts it once every
+#     insert has finished, so the waits are one shared set released
+#     together. Past the condition, a delete writes "DELETE AWAKENED"
+#     (whether it waited or not) and a search its "SEARCH" line; the first
+#     such line after some waits shows the broadcast has happened, and
+#     closes all of them at its time. Which operation each wait belonged
+#     to can't be told from the log, so the blocked times are reported
+#     for deletes and searches together.
+
+# Histogram over power-of-two buckets of microseconds: bucket k counts
+# values in [2**(k-1), 2**k), bucket 0 counts zero
+class Histogram:
+    def __init__(self):
+        self.buckets = []
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value):
+        value = max(value, 0)  # Lines written out of order can make a span negative
+        bucket = value.bit_length()
+        if bucket >= len(self.buckets):
+            self.buckets.extend([0] * (bucket + 1 - len(self.buckets)))
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    # Fold another histogram's values into this one
+    def merge(self, other):
+        if len(other.buckets) > len(self.buckets):
+            self.buckets.extend([0] * (len(other.buckets) - len(self.buckets)))
+        for bucket, count in enumerate(other.buckets):
+            self.buckets[bucket] += count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.minimum, other.maximum):
+            if value is not None:
+                self.minimum = value if self.minimum is None else min(self.minimum, value)
+                self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    # Upper bound of the bucket holding the given fraction of the values
+    def percentile(self, fraction):
+        if not self.count:
+            return 0
+        wanted = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= wanted:
+                return min((1 << bucket) - 1 if bucket else 0, self.maximum)
+        return self.maximum
+
+    def report(self):
+        return {
+            "count": self.count,
+            "mean_us": self.total / self.count if self.count else 0.0,
+            "min_us": self.minimum or 0,
+            "max_us": self.maximum or 0,
+            "p50_us": self.percentile(0.5),
+            "p90_us": self.percentile(0.9),
+            "p99_us": self.percentile(0.99),
+            "buckets": [{"low_us": (1 << (bucket - 1)) if bucket else 0, "high_us": (1 << bucket) - 1 if bucket else 0, "count": count}
+                        for bucket, count in enumerate(self.buckets) if count],
+        }
+
+# Lines of a log file (or stdin for "-"), gzip-compressed or not
+def read_lines(log_file):
+    if log_file == "-":
+        yield from sys.stdin
+        return
+    opener = gzip.open if log_file.endswith(".gz") else open
+    with opener(log_file, 'rt', errors='replace') as file:
+        yield from file
+
+# Turn log lines into (kind, time, detail) events. Kinds are the op names
+# (INSERT, DELETE, SEARCH), ACQUIRE/RELEASE with the lock mode as detail,
+# WAITING, AWAKENED, RESULT (a search hit or miss), COUNT (the closing
+# acquisition/release counts) and RECORD (the final table dump).
+def parse_events(lines):
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line:
+            continue
+        if line.startswith("Number of lock "):
+            name, _, value = line.rpartition(":")
+            yield ("COUNT", None, (name[len("Number of lock "):], int(value)))
+            continue
+        if line == "No Record Found":
+            yield ("RESULT", None, False)
+            continue
+        if line.startswith("Running "):
+            yield ("THREADS", None, int(line.split()[1]))
+            continue
+
+        # "<time>: WAITING ON INSERTS" and "<time>: DELETE AWAKENED"
+        stamp, colon, rest = line.partition(": ")
+        if colon and stamp.isdigit():
+            if rest == "WAITING ON INSERTS":
+                yield ("WAITING", int(stamp), None)
+            elif rest == "DELETE AWAKENED":
+                yield ("AWAKENED", int(stamp), None)
+            continue
+
+        fields = line.split(",")
+        if len(fields) < 2 or not fields[0].isdigit():
+            continue
+        if fields[1] in ("INSERT", "DELETE", "SEARCH"):
+            yield (fields[1], int(fields[0]), fields[2] if len(fields) > 2 else "")
+        elif fields[1].endswith(" LOCK ACQUIRED"):
+            yield ("ACQUIRE", int(fields[0]), fields[1].split()[0].lower())
+        elif fields[1].endswith(" LOCK RELEASED"):
+            yield ("RELEASE", int(fields[0]), fields[1].split()[0].lower())
+        elif len(fields) == 3:
+            # "hash,name,salary": a search hit, or a row of the final table
+            yield ("RECORD", None, fields[1])
+
+class Analysis:
+    def __init__(self):
+        self.threads = None
+        self.first_time = None
+        self.last_time = None
+        self.ops = {"INSERT": 0, "DELETE": 0, "SEARCH": 0}
+        self.open_requests = {"read": deque(), "write": deque()}  # Request times of locks not yet released
+        self.last_release = 0  # Latest release of any lock
+        self.last_write_release = 0  # Latest release of a write lock
+        self.wait = {"read": Histogram(), "write": Histogram()}
+        self.hold = {"read": Histogram(), "write": Histogram()}
+        self.latency = {"read": Histogram(), "write": Histogram()}  # Request to release
+        self.unmatched_releases = 0
+        self.open_waits = []  # Times of "WAITING ON INSERTS" not yet released
+        self.blocked = Histogram()  # Wait to release, for every released wait
+        self.never_woken = 0  # Waits still open when their run's log ended
+        self.search_hits = 0
+        self.search_misses = 0
+        self.searches_pending = 0  # Searches whose result line hasn't been seen
+        self.table_rows = 0
+        self.in_table = False  # Past the closing counts, in the final table dump
+        self.counts = {}  # The log's own acquisition/release counts, summed over runs
+
+    def feed(self, events):
+        for kind, time, detail in events:
+            if time is not None:
+                if self.first_time is None:
+                    self.first_time = time
+                self.first_time = min(self.first_time, time)
+                self.last_time = time if self.last_time is None else max(self.last_time, time)
+
+            if kind == "ACQUIRE":
+                self.open_requests[detail].append(time)
+            elif kind == "RELEASE":
+                requests = self.open_requests[detail]
+                if not requests:
+                    self.unmatched_releases += 1
+                    continue
+                requested = requests.popleft()
+                # Granted once nothing it conflicts with was held any more
+                granted = max(requested, self.last_release if detail == "write" else self.last_write_release)
+                granted = min(granted, time)
+                self.wait[detail].add(granted - requested)
+                self.hold[detail].add(time - granted)
+                self.latency[detail].add(time - requested)
+                self.last_release = max(self.last_release, time)
+                if detail == "write":
+                    self.last_write_release = max(self.last_write_release, time)
+            elif kind in self.ops:
+                self.ops[kind] += 1
+                if kind == "SEARCH":
+                    self.searches_pending += 1
+                    self.release_waits(time)
+            elif kind == "WAITING":
+                self.open_waits.append(time)
+            elif kind == "AWAKENED":
+                self.release_waits(time)
+            elif kind == "RESULT":
+                self.searches_pending -= 1
+                self.search_misses += 1
+            elif kind == "RECORD":
+                # Before the closing counts, a record line is a search hit
+                if self.searches_pending > 0 and not self.in_table:
+                    self.searches_pending -= 1
+                    self.search_hits += 1
+                else:
+                    self.table_rows += 1
+            elif kind == "COUNT":
+                self.counts[detail[0]] = self.counts.get(detail[0], 0) + detail[1]
+                self.in_table = True
+            elif kind == "THREADS":
+                # Start of a run; logs of several runs may be concatenated
+                self.threads = detail if self.threads is None else max(self.threads, detail)
+                self.in_table = False
+                self.searches_pending = 0
+                self.never_woken += len(self.open_waits)
+                self.open_waits = []
+        return self
+
+    # An operation got past the inserts condition at time, so the broadcast
+    # has released every wait open until then
+    def release_waits(self, time):
+        for waited in self.open_waits:
+            self.blocked.add(time - waited)
+        self.open_waits = []
+
+    def report(self):
+        span_us = (self.last_time - self.first_time) if self.first_time is not None else 0
+        seconds = span_us / 1e6
+        return {
+            "threads": self.threads,
+            "span_us": span_us,
+            "operations": {
+                op.lower(): {"count": count, "per_second": count / seconds if seconds else 0.0}
+                for op, count in self.ops.items()
+            },
+            "locks": {
+                mode: {
+                    "pairs": self.wait[mode].count,
+                    "still_held": len(self.open_requests[mode]),
+                    "wait": self.wait[mode].report(),
+                    "hold": self.hold[mode].report(),
+                    "latency": self.latency[mode].report(),
+                }
+                for mode in ("read", "write")
+            },
+            "unmatched_releases": self.unmatched_releases,
+            "inserts_condition": {
+                "blocked": self.blocked.report(),  # Deletes and searches together
+                "never_woken": self.never_woken + len(self.open_waits),
+            },
+            "searches": {"hits": self.search_hits, "misses": self.search_misses},
+            "table_rows": self.table_rows,
+            "logged_counts": self.counts,
+        }
+
+# Flatten a report into (metric, value) rows; histogram buckets become
+# one row each
+def report_rows(report, prefix=""):
+    for key, value in report.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from report_rows(value, name + ".")
+        elif isinstance(value, list):
+            for bucket in value:
+                yield (f"{name}.{bucket['low_us']}-{bucket['high_us']}us", bucket["count"])
+        else:
+            yield (name, value)
+
+def analyze_log(log_file):
+    return Analysis().feed(parse_events(read_lines(log_file))).report()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lock contention report for a chash output.txt trace.")
+    parser.add_argument("log_file", nargs="?", default="output.txt", help="trace to read (.gz works, - for stdin)")
+    parser.add_argument("--csv", action="store_true", help="write metric,value rows instead of JSON")
+    parser.add_argument("-o", "--output", help="write the report here instead of stdout")
+    options = parser.parse_args()
+
+    try:
+        report = analyze_log(options.log_file)
+    except OSError as error:
+        print(f"Error: {error}")
+        sys.exit(1)
+
+    output = open(options.output, 'w', newline="") if options.output else sys.stdout
+    try:
+        if options.csv:
+            writer = csv.writer(output)
+            writer.writerow(["metric", "value"])
+            writer.writerows(report_rows(report))
+        else:
+            json.dump(report, output, indent=2)
+            output.write("\n")
+    finally:
+        if options.output:
+            output.close()
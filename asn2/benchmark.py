@@ -0,0 +1,193 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from analyze_log import Analysis, Histogram, parse_events, read_lines
+from generate_commands import generate_commands, write_commands
+
+# Throughput benchmark for chash. Builds chash.c with room for the largest
+# run, generates seeded command files for every (thread count, workload)
+# case, runs the binary on each (several cases at once, each in a
+# directory of its own since chash reads commands.txt and writes
+# output.txt in its working directory), and measures throughput and lock
+# latency from the trace timestamps with analyze_log. Each report is
+# appended to a JSON history, and compared with the previous report there.
+#
+# chash starts one thread per command, so a case's thread count is also
+# its command count. Cases running side by side share the CPUs; use
+# --jobs 1 for the cleanest numbers.
+
+DEFAULT_THREADS = [10, 50, 100, 500, 1000]
+
+# name:read ratio:Zipf skew
+DEFAULT_WORKLOADS = "read90:0.9:0.99,mixed:0.5:0.99,write90:0.1:0.99,uniform:0.5:0"
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Parse "name:read_ratio:skew" workload specs
+def parse_workloads(specs):
+    workloads = []
+    for spec in specs.split(","):
+        parts = spec.split(":")
+        if len(parts) != 3:
+            raise ValueError(f"Workload {spec} is not name:read_ratio:skew.")
+        workloads.append({"name": parts[0], "read_ratio": float(parts[1]), "skew": float(parts[2])})
+    return workloads
+
+# Compile chash.c into directory with MAX_COMMANDS raised to max_commands
+def build_binary(directory, max_commands):
+    binary = os.path.join(directory, "chash")
+    command = [os.environ.get("CC", "gcc"), "-O2", "-pthread", "-std=c99", f"-DMAX_COMMANDS={max_commands}",
+               "-o", binary, os.path.join(HERE, "chash.c")]
+    subprocess.run(command, check=True)
+    return binary
+
+# Run the binary once on the given command lines in workdir; returns the
+# wall time and the analysis of its trace, or None if it crashed
+def run_once(binary, workdir, lines):
+    write_commands(os.path.join(workdir, "commands.txt"), lines)
+    started = time.perf_counter()
+    result = subprocess.run([binary], cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        return wall, None
+    return wall, Analysis().feed(parse_events(read_lines(os.path.join(workdir, "output.txt"))))
+
+# Run one (threads, workload) case repeats times and return its result row
+def run_case(binary, workdir, threads, workload, keys, seed, repeats):
+    os.makedirs(workdir, exist_ok=True)
+    operations = 0
+    span_us = 0
+    wall = 0.0
+    failures = 0
+    latency = {"read": Histogram(), "write": Histogram()}
+    wait = {"read": Histogram(), "write": Histogram()}
+    blocked = Histogram()  # Deletes and searches waiting on the inserts
+    for repeat in range(repeats):
+        lines = generate_commands(threads, seed=seed + repeat, read_ratio=workload["read_ratio"],
+                                  keys=keys, skew=workload["skew"])
+        run_wall, analysis = run_once(binary, workdir, lines)
+        if analysis is None:
+            failures += 1
+            continue
+        wall += run_wall
+        operations += sum(analysis.ops.values())
+        if analysis.first_time is not None:
+            span_us += analysis.last_time - analysis.first_time
+        for mode in ("read", "write"):
+            latency[mode].merge(analysis.latency[mode])
+            wait[mode].merge(analysis.wait[mode])
+        blocked.merge(analysis.blocked)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    row = {
+        "threads": threads,
+        "workload": workload["name"],
+        "read_ratio": workload["read_ratio"],
+        "skew": workload["skew"],
+        "runs": repeats - failures,
+        "failures": failures,
+        "operations": operations,
+        "ops_per_sec": operations / (span_us / 1e6) if span_us else 0.0,  # From the first to the last trace line
+        "wall_ops_per_sec": operations / wall if wall else 0.0,  # Including process start and thread creation
+        "blocked_mean_us": blocked.report()["mean_us"],
+    }
+    for mode in ("read", "write"):
+        report = latency[mode].report()
+        for key in ("count", "mean_us", "p50_us", "p90_us", "p99_us", "max_us"):
+            row[f"{mode}_latency_{key}"] = report[key]
+        row[f"{mode}_wait_p99_us"] = wait[mode].percentile(0.99)
+    return row
+
+# Current git revision, if this is a git checkout
+def git_revision():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=HERE)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+# Run every (threads, workload) case and return the full report
+def run_benchmarks(thread_counts, workloads, keys, seed, repeats, jobs, binary=None):
+    cases = [(threads, workload) for threads in thread_counts for workload in workloads]
+    with tempfile.TemporaryDirectory() as workdir:
+        if binary is None:
+            binary = build_binary(workdir, max(thread_counts))
+        with ThreadPoolExecutor(jobs) as executor:
+            futures = [executor.submit(run_case, binary, os.path.join(workdir, f"case-{number}"), threads, workload,
+                                       keys, seed, repeats)
+                       for number, (threads, workload) in enumerate(cases)]
+            results = []
+            for future in futures:
+                row = future.result()
+                print(f"{row['threads']:>6} {row['workload']:<8} {row['ops_per_sec']:>12.0f} ops/s "
+                      f"write p99 {row['write_latency_p99_us']:>7}us read p99 {row['read_latency_p99_us']:>7}us"
+                      f"{'  ' + str(row['failures']) + ' crashed' if row['failures'] else ''}", file=sys.stderr)
+                results.append(row)
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": seed,
+        "keys": keys,
+        "repeats": repeats,
+        "jobs": jobs,
+        "results": results,
+    }
+
+# Reports saved so far; a file holding a single report counts as a history of one
+def load_history(history_file):
+    if not os.path.exists(history_file):
+        return []
+    with open(history_file) as file:
+        history = json.load(file)
+    return history if isinstance(history, list) else [history]
+
+# Print throughput and latency ratios against an earlier report
+def compare_reports(baseline, report):
+    previous = {(row["threads"], row["workload"]): row for row in baseline["results"]}
+    print(f"Compared with revision {baseline.get('revision')} ({baseline.get('timestamp')}):")
+    for row in report["results"]:
+        old = previous.get((row["threads"], row["workload"]))
+        if old is None or not old["ops_per_sec"]:
+            continue
+        print(f"{row['threads']:>6} {row['workload']:<8} ops/s x{row['ops_per_sec'] / old['ops_per_sec']:.2f} "
+              f"write p99 x{row['write_latency_p99_us'] / max(old['write_latency_p99_us'], 1):.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark chash on generated command files.")
+    parser.add_argument("--threads", default=",".join(str(threads) for threads in DEFAULT_THREADS),
+                        help="thread (command) counts to run")
+    parser.add_argument("--workloads", default=DEFAULT_WORKLOADS, help="name:read_ratio:skew,...")
+    parser.add_argument("--keys", type=int, default=1000, help="size of the key space")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=5, help="runs per case")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="cases run at once")
+    parser.add_argument("--binary", help="prebuilt chash to run instead of building one (it must allow enough commands)")
+    parser.add_argument("-o", "--output", default="chash-benchmark-history.json", help="history file to append to")
+    options = parser.parse_args()
+
+    try:
+        thread_counts = [int(threads) for threads in options.threads.split(",")]
+        workloads = parse_workloads(options.workloads)
+        history = load_history(options.output)
+        report = run_benchmarks(thread_counts, workloads, options.keys, options.seed, options.repeats,
+                                max(options.jobs, 1), options.binary and os.path.abspath(options.binary))
+    except (ValueError, OSError, subprocess.CalledProcessError) as error:
+        print(f"Error: {error}")
+        sys.exit(1)
+
+    if history:
+        compare_reports(history[-1], report)
+    history.append(report)
+    with open(options.output, 'w') as file:
+        json.dump(history, file, indent=2)
@@ -37,7 +37,9 @@
 #include <sys/time.h>
 #include <inttypes.h>
 
-#define MAX_COMMANDS 100
+#ifndef MAX_COMMANDS
+#define MAX_COMMANDS 100           // Override with -DMAX_COMMANDS=N
+#endif
 
 // Define hasRecord Structure.
 typedef struct hash_struct
@@ -342,14 +344,15 @@ int main()
     sscanf(line, "threads,%d,0", &num_threads);
     fprintf(output_fp, "Running %d threads\n", num_threads);
 
-    // Arrays for Threads & Commands.
-    pthread_t threads[MAX_COMMANDS];
-    Command *commands[MAX_COMMANDS];
+    // Arrays for Threads & Command Types (static, as MAX_COMMANDS may be large).
+    // Threads free their Command, so main keeps its own copy of the type.
+    static pthread_t threads[MAX_COMMANDS];
+    static int is_insert[MAX_COMMANDS];
     int thread_count = 0;
     int num_inserts = 0;
 
     // Parse Commands & Create Threads.
-    while (fgets(line, sizeof(line), fp) != NULL)
+    while (thread_count < MAX_COMMANDS && fgets(line, sizeof(line), fp) != NULL)
     {
         // Remove Newline.
         line[strcspn(line, "\n")] = '\0';
@@ -392,18 +395,33 @@ int main()
             continue;
         }
 
-        // Store Command & Create Thread.
-        commands[thread_count] = cmd;
+        // Store Command Type & Create Thread.
+        is_insert[thread_count] = strcmp(cmd->command_type, "insert") == 0;
         pthread_create(&threads[thread_count], NULL, thread_function, (void *)cmd);
         thread_count++;
     }
 
+    // Warn About Commands Past MAX_COMMANDS, Which Are Not Run.
+    int unread = 0;
+    while (fgets(line, sizeof(line), fp) != NULL)
+    {
+        if (line[strspn(line, " \t\r\n")] != '\0')
+        {
+            unread++;
+        }
+    }
+    if (unread > 0)
+    {
+        fprintf(stderr, "Warning: only the first %d commands were run, %d more were skipped "
+                        "(rebuild with -DMAX_COMMANDS=N to run more).\n", MAX_COMMANDS, unread);
+    }
+
     fclose(fp);
 
     // Wait for All Insert Threads.
     for (int j = 0; j < thread_count; j++)
     {
-        if (strcmp(commands[j]->command_type, "insert") == 0)
+        if (is_insert[j])
         {
             pthread_join(threads[j], NULL);
         }
@@ -418,7 +436,7 @@ int main()
     // Wait For Other Threads to Finish.
     for (int j = 0; j < thread_count; j++)
     {
-        if (strcmp(commands[j]->command_type, "insert") != 0)
+        if (!is_insert[j])
         {
             pthread_join(threads[j], NULL);
         }
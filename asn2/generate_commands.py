@@ -0,0 +1,70 @@
+import argparse
+import bisect
+import itertools
+import random
+import sys
+
+# Synthetic command generator for chash. Writes the commands.txt format
+# (a "threads,N,0" line, then insert/delete/search lines) with a chosen
+# share of searches, keys drawn from a Zipf distribution over a fixed key
+# space, and nonzero salaries (chash reports a salary of 0 as a miss).
+# The same seed always produces the same file.
+
+# Cumulative weights of a Zipf distribution over ranks 1..keys: rank r is
+# drawn with probability proportional to 1 / r**skew (skew 0 is uniform)
+def zipf_weights(keys, skew):
+    return list(itertools.accumulate(1 / rank ** skew for rank in range(1, keys + 1)))
+
+# Key names for the key space. Names stay well under chash's 50 characters.
+def key_name(rank):
+    return f"key{rank:07d}"
+
+# Build the lines of a commands.txt for one generated workload. read_ratio
+# is the share of searches; the rest are inserts and deletes, delete_share
+# of them deletes.
+def generate_commands(count, seed=0, read_ratio=0.5, delete_share=0.25, keys=1000, skew=0.99,
+                      min_salary=1, max_salary=200000):
+    if not 0 <= read_ratio <= 1 or not 0 <= delete_share <= 1:
+        raise ValueError("Read ratio and delete share must be between 0 and 1.")
+    if keys < 1:
+        raise ValueError("Key space must hold at least one key.")
+    rng = random.Random(seed)
+    weights = zipf_weights(keys, skew)
+    total = weights[-1]
+
+    lines = [f"threads,{count},0"]
+    for _ in range(count):
+        name = key_name(bisect.bisect_left(weights, rng.random() * total) + 1)
+        if rng.random() < read_ratio:
+            lines.append(f"search,{name},0")
+        elif rng.random() < delete_share:
+            lines.append(f"delete,{name},0")
+        else:
+            lines.append(f"insert,{name},{rng.randint(min_salary, max_salary)}")
+    return lines
+
+def write_commands(output_file, lines):
+    if output_file == "-":
+        sys.stdout.writelines(line + "\n" for line in lines)
+        return
+    with open(output_file, 'w') as file:
+        file.writelines(line + "\n" for line in lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a seeded commands.txt for chash.")
+    parser.add_argument("count", type=int, help="number of commands (chash runs one thread per command)")
+    parser.add_argument("-o", "--output", default="-", help="output file (default stdout)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--read-ratio", type=float, default=0.5, help="share of searches")
+    parser.add_argument("--delete-share", type=float, default=0.25, help="share of the writes that are deletes")
+    parser.add_argument("--keys", type=int, default=1000, help="size of the key space")
+    parser.add_argument("--skew", type=float, default=0.99, help="Zipf exponent of key popularity (0 is uniform)")
+    options = parser.parse_args()
+
+    try:
+        lines = generate_commands(options.count, seed=options.seed, read_ratio=options.read_ratio,
+                                  delete_share=options.delete_share, keys=options.keys, skew=options.skew)
+    except ValueError as error:
+        print(f"Error: {error}")
+        sys.exit(1)
+    write_commands(options.output, lines)
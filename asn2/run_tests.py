@@ -0,0 +1,126 @@
+import io
+import os
+import sys
+import traceback
+
+from striped_hash import StripedHashMap, jenkins_one_at_a_time_hash, parse_commands, replay
+
+# Checks of striped_hash.py against chash. commands.txt and the output.txt
+# chash wrote for it are the reference: replaying the script must give
+# the same final table, lock counts and search results. Search results
+# depend on which deletes ran first, so they are compared on a replay in
+# the order chash's trace shows; the threaded replay only has to end with
+# the same table. Run from anywhere:
+#
+#     python run_tests.py
+
+COMMANDS_FILE = "commands.txt"
+TRACE_FILE = "output.txt"  # chash's trace for COMMANDS_FILE
+
+# The parts of a chash trace a replay must reproduce: (operations in the
+# order they were logged, search results, lock acquisitions and releases,
+# final table lines)
+def read_trace(lines):
+    end = lines.index("")  # Blank line before the lock counts and the table
+    operations, results = [], []
+    for line in lines[1:end]:
+        parts = line.split(",")
+        if len(parts) == 4 and parts[1] == "INSERT":
+            operations.append(("insert", parts[2], int(parts[3])))
+        elif len(parts) == 3 and parts[1] in ("DELETE", "SEARCH"):
+            operations.append((parts[1].lower(), parts[2], 0))
+        elif len(parts) == 3 or line == "No Record Found":
+            results.append(line)  # "hash,name,salary" of a search that found its name
+    counts = tuple(int(line.rsplit(": ", 1)[1]) for line in lines[end + 1:end + 3])
+    return operations, results, counts, lines[end + 3:]
+
+# Trace lines of a map's final table, as chash prints it
+def table_lines(table):
+    return [f"{hash},{name},{salary}" for hash, name, salary in table.records()]
+
+def load_reference():
+    with open(COMMANDS_FILE) as file:
+        threads, commands = parse_commands(file)
+    with open(TRACE_FILE) as file:
+        return threads, commands, read_trace(file.read().splitlines())
+
+# The script run one command at a time, in the order chash logged them
+def check_trace_order():
+    _, commands, (operations, results, counts, final) = load_reference()
+    if sorted(operations) != sorted(commands):
+        return f"trace operations {operations} are not the script's {commands}"
+    table = StripedHashMap()
+    found = []
+    for command, name, salary in operations:
+        if command == "insert":
+            table.insert(name, salary)
+        elif command == "delete":
+            table.delete(name)
+        else:
+            record = table.search(name)
+            found.append("No Record Found" if record is None else ",".join(map(str, record)))
+    if found != results:
+        return f"searches found {found}, chash {results}"
+    if table.lock_counts() != counts:
+        return f"lock acquisitions and releases {table.lock_counts()}, chash {counts}"
+    if table_lines(table) != final:
+        return f"final table {table_lines(table)}, chash {final}"
+    return None
+
+# The script replayed on threads, as python striped_hash.py does
+def check_threaded_replay():
+    threads, commands, (_, results, counts, final) = load_reference()
+    output = io.StringIO()
+    replay(threads, commands, output)
+    lines = output.getvalue().splitlines()
+    _, replayed_results, replayed_counts, replayed_final = read_trace(lines)
+    if lines[0] != f"Running {threads} threads":
+        return f"first line {lines[0]}"
+    if len(replayed_results) != len(results):
+        return f"{len(replayed_results)} search results, chash {len(results)}"
+    if replayed_counts != counts:
+        return f"lock acquisitions and releases {replayed_counts}, chash {counts}"
+    if replayed_final != final:
+        return f"final table {replayed_final}, chash {final}"
+    return None
+
+# The one intentional difference (see the top of striped_hash.py): a
+# repeated insert updates the name's record wherever it sits, where chash
+# adds a second record unless the name has the lowest hash
+def check_duplicate_inserts():
+    names = sorted(["Sid Meier", "Carol Shaw", "Gabe Newell"], key=jenkins_one_at_a_time_hash)
+    table = StripedHashMap()
+    for salary, name in enumerate(names, 1):
+        table.insert(name, salary)
+    for salary, name in enumerate(names, 10):
+        table.insert(name, salary)
+    expected = [(jenkins_one_at_a_time_hash(name), name, salary) for salary, name in enumerate(names, 10)]
+    if table.records() != expected:
+        return f"after repeated inserts {table.records()}, expected {expected}"
+    table.delete(names[-1])
+    if table.search(names[-1]) is not None:
+        return f"{names[-1]} is still found after its delete"
+    return None
+
+CHECKS = [check_trace_order, check_threaded_replay, check_duplicate_inserts]
+
+def run_all_tests():
+    failures = 0
+    for check in CHECKS:
+        try:
+            message = check()
+        except Exception:
+            message = f"error:\n{traceback.format_exc()}"
+        if message is None:
+            print(f"{check.__name__}: Pass")
+        else:
+            failures += 1
+            print(f"{check.__name__}: Fail")
+            print(message)
+    print(f"{len(CHECKS) - failures} passed, {failures} failed")
+    return failures == 0
+
+if __name__ == "__main__":
+    # Run from the folder holding the reference files so relative paths line up
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    sys.exit(0 if run_all_tests() else 1)
@@ -0,0 +1,326 @@
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from generate_commands import generate_commands
+
+# Python reference implementation of chash: the same insert/delete/search
+# commands, Jenkins one-at-a-time hash, "deletes and searches wait for the
+# inserts" rule, output.txt trace and final print ordering, but with the
+# records spread over buckets guarded by a set of reader-writer locks
+# (stripes) instead of one sorted list under one global lock.
+#
+#     python striped_hash.py commands.txt -o output.txt --stripes 16
+#     python striped_hash.py --bench --workers 1,2,4,8 --stripes 1,16
+#
+# Replaying a script runs every command as a task on a thread pool, the
+# way chash runs each on a thread of its own. Inserts are submitted first:
+# the others wait for every insert to finish anyway, and a pool smaller
+# than the script would otherwise fill up with waiting tasks.
+#
+# --bench measures how the striping scales with the number of threads, on
+# a generated script and without the trace. On a free-threaded CPython
+# build the threads actually run in parallel; the report says whether the
+# GIL was on.
+#
+# Intentional differences from chash, all on inserting a name that is
+# already present (run_tests.py checks everything else against chash's
+# own output.txt):
+#   - here the insert always updates the record's salary, as chash's header
+#     describes. chash only spots the duplicate when the record is the
+#     first in its list; otherwise it links a second record with the same
+#     name in front of the first.
+#   - so after such an insert chash prints both records in the final table,
+#     while here there is one, with the newer salary.
+#   - a later delete of the name removes chash's newer record and brings
+#     the older salary back to its searches; here it removes the name.
+
+MASK = 0xFFFFFFFF
+DEFAULT_STRIPES = 16
+BUCKETS_PER_STRIPE = 4
+
+# Jenkins's one_at_a_time hash, as chash computes it: bytes of the UTF-8
+# name, added as C's (signed) char
+def jenkins_one_at_a_time_hash(key):
+    hash = 0
+    for byte in key.encode():
+        hash = (hash + (byte - 256 if byte >= 128 else byte)) & MASK
+        hash = (hash + (hash << 10)) & MASK
+        hash ^= hash >> 6
+    hash = (hash + (hash << 3)) & MASK
+    hash ^= hash >> 11
+    hash = (hash + (hash << 15)) & MASK
+    return hash
+
+# Reader-writer lock that counts its acquisitions and releases. Waiting
+# writers hold back new readers, so a stream of searches can't starve an
+# insert.
+class ReadWriteLock:
+    def __init__(self):
+        self.condition = threading.Condition(threading.Lock())
+        self.readers = 0
+        self.writing = False
+        self.writers_waiting = 0
+        self.acquisitions = 0
+        self.releases = 0
+
+    def acquire_read(self):
+        with self.condition:
+            while self.writing or self.writers_waiting:
+                self.condition.wait()
+            self.readers += 1
+            self.acquisitions += 1
+
+    def release_read(self):
+        with self.condition:
+            self.readers -= 1
+            self.releases += 1
+            if not self.readers:
+                self.condition.notify_all()
+
+    def acquire_write(self):
+        with self.condition:
+            self.writers_waiting += 1
+            while self.writing or self.readers:
+                self.condition.wait()
+            self.writers_waiting -= 1
+            self.writing = True
+            self.acquisitions += 1
+
+    def release_write(self):
+        with self.condition:
+            self.writing = False
+            self.releases += 1
+            self.condition.notify_all()
+
+# Hash map of name -> salary over buckets, bucket b guarded by stripe
+# b % stripes. Each bucket is a dict, so an operation costs one hash and
+# one dict lookup under its stripe's lock.
+class StripedHashMap:
+    def __init__(self, stripes=DEFAULT_STRIPES, buckets=None):
+        self.stripes = [ReadWriteLock() for _ in range(stripes)]
+        self.buckets = [{} for _ in range(buckets or stripes * BUCKETS_PER_STRIPE)]
+
+    # (hash, bucket, stripe) of a name
+    def locate(self, name):
+        hash = jenkins_one_at_a_time_hash(name)
+        bucket = hash % len(self.buckets)
+        return hash, self.buckets[bucket], self.stripes[bucket % len(self.stripes)]
+
+    # Insert or update; log(line) is called with chash's lock lines, if given
+    def insert(self, name, salary, log=None):
+        _, bucket, stripe = self.locate(name)
+        if log:
+            log("WRITE LOCK ACQUIRED")
+        stripe.acquire_write()
+        bucket[name] = salary
+        stripe.release_write()
+        if log:
+            log("WRITE LOCK RELEASED")
+
+    # Remove a name if present
+    def delete(self, name, log=None):
+        _, bucket, stripe = self.locate(name)
+        if log:
+            log("WRITE LOCK ACQUIRED")
+        stripe.acquire_write()
+        bucket.pop(name, None)
+        stripe.release_write()
+        if log:
+            log("WRITE LOCK RELEASED")
+
+    # (hash, name, salary), or None if the name isn't present. report(record)
+    # is called while the lock is held, as chash prints its result.
+    def search(self, name, log=None, report=None):
+        hash, bucket, stripe = self.locate(name)
+        if log:
+            log("READ LOCK ACQUIRED")
+        stripe.acquire_read()
+        salary = bucket.get(name)
+        record = None if salary is None else (hash, name, salary)
+        if report:
+            report(record)
+        stripe.release_read()
+        if log:
+            log("READ LOCK RELEASED")
+        return record
+
+    # Every record in chash's print order (ascending hash), read under all
+    # the stripes at once so it is a consistent snapshot
+    def records(self):
+        for stripe in self.stripes:
+            stripe.acquire_read()
+        try:
+            records = [(jenkins_one_at_a_time_hash(name), name, salary)
+                       for bucket in self.buckets for name, salary in bucket.items()]
+        finally:
+            for stripe in reversed(self.stripes):
+                stripe.release_read()
+        records.sort(key=lambda record: record[0])
+        return records
+
+    def lock_counts(self):
+        return (sum(stripe.acquisitions for stripe in self.stripes),
+                sum(stripe.releases for stripe in self.stripes))
+
+# Parse a commands.txt script: (thread count, [(command, name, salary)]).
+# Like chash, unknown commands are skipped.
+def parse_commands(lines):
+    threads = 0
+    commands = []
+    for number, line in enumerate(lines):
+        parts = line.rstrip("\n").split(",")
+        if number == 0:
+            if len(parts) < 2 or parts[0] != "threads":
+                raise ValueError(f"First line must be threads,N,0, not {line.strip()}.")
+            threads = int(parts[1])
+        elif parts[0] in ("insert", "delete", "search") and len(parts) >= 2:
+            salary = int(parts[2]) if parts[0] == "insert" and len(parts) > 2 else 0
+            commands.append((parts[0], parts[1], salary))
+    return threads, commands
+
+# The "deletes wait for inserts" rule: a condition that opens once every
+# insert of the script has finished
+class InsertsDone:
+    def __init__(self, inserts):
+        self.condition = threading.Condition()
+        self.remaining = inserts
+
+    def finished_one(self):
+        with self.condition:
+            self.remaining -= 1
+            if not self.remaining:
+                self.condition.notify_all()
+
+    # Wait for the inserts, calling waiting() each time before blocking
+    def wait(self, waiting=None):
+        with self.condition:
+            while self.remaining:
+                if waiting:
+                    waiting()
+                self.condition.wait()
+
+# Replay a script on a map, writing chash's trace to output (a text file).
+# Returns the map.
+def replay(threads, commands, output, stripes=DEFAULT_STRIPES, workers=None):
+    table = StripedHashMap(stripes)
+    output_lock = threading.Lock()  # One line at a time, as fprintf does
+
+    def write(line):
+        with output_lock:
+            output.write(line + "\n")
+
+    def log(line):
+        write(f"{time.time_ns() // 1000},{line}")
+
+    def stamped(line):
+        write(f"{time.time_ns() // 1000}: {line}")
+
+    def report(record):
+        # chash takes a salary of 0 for a miss
+        write(f"{record[0]},{record[1]},{record[2]}" if record and record[2] else "No Record Found")
+
+    inserts = InsertsDone(sum(1 for command in commands if command[0] == "insert"))
+
+    def run(command, name, salary):
+        if command == "insert":
+            log(f"INSERT,{name},{salary}")
+            table.insert(name, salary, log)
+            inserts.finished_one()
+            return
+        inserts.wait(lambda: stamped("WAITING ON INSERTS"))
+        if command == "delete":
+            stamped("DELETE AWAKENED")
+            log(f"DELETE,{name}")
+            table.delete(name, log)
+        else:
+            log(f"SEARCH,{name}")
+            table.search(name, log, report)
+
+    write(f"Running {threads} threads")
+    ordered = [command for command in commands if command[0] == "insert"]
+    ordered += [command for command in commands if command[0] != "insert"]
+    with ThreadPoolExecutor(workers or max(threads, 1)) as executor:
+        for future in [executor.submit(run, *command) for command in ordered]:
+            future.result()
+
+    acquisitions, releases = table.lock_counts()
+    write("")
+    write(f"Number of lock acquisitions: {acquisitions}")
+    write(f"Number of lock releases: {releases}")
+    for hash, name, salary in table.records():
+        write(f"{hash},{name},{salary}")
+    return table
+
+# Time one generated script on workers threads and the given stripe count:
+# the inserts first, then the deletes and searches, each phase split evenly
+# over the threads
+def bench_case(commands, workers, stripes):
+    table = StripedHashMap(stripes)
+
+    def run(chunk):
+        for command, name, salary in chunk:
+            if command == "insert":
+                table.insert(name, salary)
+            elif command == "delete":
+                table.delete(name)
+            else:
+                table.search(name)
+
+    phases = [[command for command in commands if command[0] == "insert"],
+              [command for command in commands if command[0] != "insert"]]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(workers) as executor:
+        for phase in phases:
+            list(executor.map(run, [phase[k::workers] for k in range(workers)]))
+    seconds = time.perf_counter() - started
+    return {
+        "workers": workers,
+        "stripes": stripes,
+        "operations": len(commands),
+        "seconds": seconds,
+        "ops_per_sec": len(commands) / seconds if seconds else 0.0,
+    }
+
+# Whether this interpreter runs with the GIL (always, before free-threaded builds)
+def gil_enabled():
+    check = getattr(sys, "_is_gil_enabled", None)
+    return True if check is None else check()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a chash commands.txt on a striped-lock hash map.")
+    parser.add_argument("commands_file", nargs="?", default="commands.txt")
+    parser.add_argument("-o", "--output", default="output.txt", help="trace file to write (- for stdout)")
+    parser.add_argument("--stripes", default=str(DEFAULT_STRIPES), help="lock stripes (a list with --bench)")
+    parser.add_argument("--workers", help="pool threads (default: the script's thread count; a list with --bench)")
+    parser.add_argument("--bench", action="store_true", help="measure scaling on a generated script instead")
+    parser.add_argument("--count", type=int, default=200000, help="commands in the --bench script")
+    parser.add_argument("--read-ratio", type=float, default=0.5, help="share of searches in the --bench script")
+    parser.add_argument("--seed", type=int, default=0)
+    options = parser.parse_args()
+
+    try:
+        if options.bench:
+            _, commands = parse_commands(generate_commands(options.count, seed=options.seed,
+                                                           read_ratio=options.read_ratio))
+            for workers in [int(workers) for workers in (options.workers or "1,2,4,8").split(",")]:
+                for stripes in [int(stripes) for stripes in options.stripes.split(",")]:
+                    row = bench_case(commands, workers, stripes)
+                    row["gil"] = gil_enabled()
+                    print(json.dumps(row))
+            sys.exit(0)
+
+        with open(options.commands_file) as file:
+            threads, commands = parse_commands(file)
+        workers = int(options.workers) if options.workers else None
+        if options.output == "-":
+            replay(threads, commands, sys.stdout, int(options.stripes), workers)
+        else:
+            with open(options.output, 'w') as output:
+                replay(threads, commands, output, int(options.stripes), workers)
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}")
+        sys.exit(1)